@@ -7,15 +7,85 @@ file-based configuration, and validation.
 
 import os
 import json
+import logging
+import pickle
+import struct
+import threading
+from functools import cached_property, lru_cache
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Dict, List, Optional, Any, Union
-from enum import Enum
+from enum import Enum, IntEnum
 import yaml
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+# Prefer the LibYAML-backed loader when PyYAML was built against it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+@lru_cache(maxsize=4)
+def _cached_dotenv(path: str, mtime_ns: int) -> Dict[str, Optional[str]]:
+    """Parse a .env file once per (path, mtime)"""
+    return dotenv_values(path)
+
+def load_env() -> None:
+    """Apply .env values to os.environ without overriding existing variables"""
+    env_path = find_dotenv()
+    if not env_path:
+        return
+    
+    for key, value in _cached_dotenv(env_path, os.stat(env_path).st_mtime_ns).items():
+        if value is not None:
+            os.environ.setdefault(key, value)
 
 # Load environment variables from .env file
-load_dotenv()
+load_env()
+
+# Sidecar cache header: source (st_mtime_ns, st_size)
+_YAML_CACHE_KEY = struct.Struct('<QQ')
+
+def load_yaml_cached(path: Union[str, Path], raw: Optional[bytes] = None,
+                     st: Optional[os.stat_result] = None) -> Any:
+    """Load a YAML file, reusing a pickled sidecar while the source is unchanged
+    
+    Callers that already read the file pass its bytes and the matching stat, so
+    the parsed data is exactly the version they read.
+    """
+    path = Path(path)
+    if st is None:
+        st = path.stat()
+    key = _YAML_CACHE_KEY.pack(st.st_mtime_ns, st.st_size)
+    cache_path = path.with_name(path.name + '.pkl')
+    
+    try:
+        with open(cache_path, 'rb') as f:
+            if f.read(_YAML_CACHE_KEY.size) == key:
+                return pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+    
+    # Hand the parser one buffer (a single read) rather than a file object it reads in chunks
+    data = yaml.load(path.read_bytes() if raw is None else raw, Loader=_YamlLoader)
+    
+    # Best effort: a read-only config directory just means no cache
+    try:
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        tmp_path.write_bytes(key + pickle.dumps(data, protocol=5))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    
+    return data
 
 class ProviderType(Enum):
     """Provider types for each module"""
@@ -23,13 +93,27 @@ class ProviderType(Enum):
     MCP = "mcp"
     HYBRID = "hybrid"
 
+# Value -> member map; unknown env or YAML values fall back to SIMPLE instead of raising
+_PT_BY_VALUE: Dict[str, ProviderType] = {pt.value: pt for pt in ProviderType}
+
 class ContentQuality(Enum):
     """Content quality standards"""
     PREMIUM = "premium"     # Highest quality, fact-checked
     STANDARD = "standard"   # Good quality, basic checks
     EXPRESS = "express"     # Quick content, minimal checks
 
-@dataclass
+class Module(IntEnum):
+    """Pipeline modules, indexing Config.modules_arr (name.lower() is the Config.modules key)"""
+    TREND_DETECTION = 0
+    SCRIPT_GENERATION = 1
+    FACT_CHECKING = 2
+    ASSET_GATHERING = 3
+    VOICEOVER = 4
+    VIDEO_ASSEMBLY = 5
+    THUMBNAIL_GENERATION = 6
+    YOUTUBE_UPLOAD = 7
+
+@dataclass(slots=True)
 class ModuleConfig:
     """Configuration for each module"""
     enabled: bool = True
@@ -39,7 +123,7 @@ class ModuleConfig:
     timeout_seconds: int = 30
     max_retries: int = 3
 
-@dataclass
+@dataclass(slots=True)
 class ChannelConfig:
     """Configuration for individual YouTube channel"""
     name: str
@@ -62,7 +146,7 @@ class ChannelConfig:
         "voice_id": "default"
     })
 
-@dataclass
+@dataclass(slots=True)
 class PipelineConfig:
     """Pipeline configuration"""
     max_concurrent_jobs: int = 3
@@ -70,8 +154,11 @@ class PipelineConfig:
     retry_attempts: int = 3
     retry_delay_seconds: int = 30
     checkpoint_interval: int = 5  # Save state every N jobs
+    strict_durability: bool = False  # Also fsync the state directory so renames survive power loss
+    max_active_pipelines: int = 10000  # Oldest pipeline states are evicted beyond this
+    max_active_jobs: int = 10000  # Oldest job states are evicted beyond this
 
-@dataclass
+@dataclass(slots=True)
 class YouTubeConfig:
     """YouTube specific configuration"""
     max_daily_uploads: int = 3
@@ -83,7 +170,7 @@ class YouTubeConfig:
     max_video_duration: int = 58  # YouTube Shorts limit
     min_video_duration: int = 15  # Minimum for engagement
 
-@dataclass
+@dataclass(slots=True)
 class ContentConfig:
     """Content generation configuration"""
     default_duration: int = 45  # seconds
@@ -94,6 +181,11 @@ class ContentConfig:
         "#shorts", "#youtubeshorts", "#shortsvideo"
     ])
 
+# Field names the YAML config may override on each section
+_PIPELINE_FIELDS = frozenset(f.name for f in fields(PipelineConfig))
+_YOUTUBE_FIELDS = frozenset(f.name for f in fields(YouTubeConfig))
+_CONTENT_FIELDS = frozenset(f.name for f in fields(ContentConfig))
+
 class Config:
     """Main configuration class"""
     
@@ -117,43 +209,36 @@ class Config:
             'backups': self.base_dir / 'data' / 'backups'
         }
         
-        # Create all directories
-        for dir_path in self.dirs.values():
-            dir_path.mkdir(parents=True, exist_ok=True)
-        
-        # Create output subdirectories
-        output_subdirs = ['pending_approval', 'approved', 'rejected', 'uploaded', 
-                         'audio', 'video', 'thumbnails']
-        for subdir in output_subdirs:
-            (self.dirs['output'] / subdir).mkdir(exist_ok=True)
+        # Create missing directories
+        self._ensure_directories()
         
         # Module configurations (MCP-ready)
         self.modules = {
             'trend_detection': ModuleConfig(
-                provider_type=ProviderType(os.getenv('TREND_PROVIDER', 'simple')),
+                provider_type=_PT_BY_VALUE.get(os.getenv('TREND_PROVIDER', 'simple'), ProviderType.SIMPLE),
                 mcp_server_url=os.getenv('TREND_MCP_URL')
             ),
             'script_generation': ModuleConfig(
-                provider_type=ProviderType(os.getenv('SCRIPT_PROVIDER', 'simple')),
+                provider_type=_PT_BY_VALUE.get(os.getenv('SCRIPT_PROVIDER', 'simple'), ProviderType.SIMPLE),
                 mcp_server_url=os.getenv('SCRIPT_MCP_URL')
             ),
             'fact_checking': ModuleConfig(
                 enabled=False,  # Disabled by default, enable for MCP
-                provider_type=ProviderType(os.getenv('FACT_CHECK_PROVIDER', 'simple')),
+                provider_type=_PT_BY_VALUE.get(os.getenv('FACT_CHECK_PROVIDER', 'simple'), ProviderType.SIMPLE),
                 mcp_server_url=os.getenv('FACT_CHECK_MCP_URL')
             ),
             'asset_gathering': ModuleConfig(
-                provider_type=ProviderType(os.getenv('ASSET_PROVIDER', 'simple')),
+                provider_type=_PT_BY_VALUE.get(os.getenv('ASSET_PROVIDER', 'simple'), ProviderType.SIMPLE),
                 mcp_server_url=os.getenv('ASSET_MCP_URL')
             ),
             'voiceover': ModuleConfig(
-                provider_type=ProviderType(os.getenv('VOICEOVER_PROVIDER', 'simple'))
+                provider_type=_PT_BY_VALUE.get(os.getenv('VOICEOVER_PROVIDER', 'simple'), ProviderType.SIMPLE)
             ),
             'video_assembly': ModuleConfig(
-                provider_type=ProviderType(os.getenv('VIDEO_PROVIDER', 'simple'))
+                provider_type=_PT_BY_VALUE.get(os.getenv('VIDEO_PROVIDER', 'simple'), ProviderType.SIMPLE)
             ),
             'thumbnail_generation': ModuleConfig(
-                provider_type=ProviderType(os.getenv('THUMBNAIL_PROVIDER', 'simple'))
+                provider_type=_PT_BY_VALUE.get(os.getenv('THUMBNAIL_PROVIDER', 'simple'), ProviderType.SIMPLE)
             ),
             'youtube_upload': ModuleConfig(
                 enabled=True,
@@ -161,6 +246,10 @@ class Config:
             )
         }
         
+        # Positional view over the same ModuleConfig objects for hot-path reads
+        self.modules_arr = tuple(self.modules[module.name.lower()] for module in Module)
+        self._recompute_use_mcp()
+        
         # Pipeline config
         self.pipeline = PipelineConfig()
         
@@ -170,21 +259,41 @@ class Config:
         # Content config
         self.content = ContentConfig()
         
-        # API configurations
-        self.apis = self._load_api_configs()
-        
-        # Channel configurations
-        self.channels = self._load_channels()
+        # API and channel configurations are loaded lazily (see `apis`, `channels`)
         
         # Load YAML config if provided
         if config_path and Path(config_path).exists():
             self._load_yaml_config(config_path)
+    
+    def _ensure_directories(self):
+        """Create the directory layout, skipping directories that already exist"""
+        # One scandir per parent directory (base_dir, data/ and output/)
+        existing: Dict[Path, set] = {}
+        
+        def ensure(dir_path: Path):
+            parent = dir_path.parent
+            if parent not in existing:
+                try:
+                    existing[parent] = {entry.name for entry in os.scandir(parent) if entry.is_dir()}
+                except OSError:
+                    existing[parent] = set()
+            
+            if dir_path.name not in existing[parent]:
+                dir_path.mkdir(parents=True, exist_ok=True)
+                existing[parent].add(dir_path.name)
+        
+        for dir_path in self.dirs.values():
+            ensure(dir_path)
         
-        # Validate configuration
-        self._validate_config()
+        # Output subdirectories are checked every time, so deleted ones are recreated
+        output_subdirs = ['pending_approval', 'approved', 'rejected', 'uploaded', 
+                         'audio', 'video', 'thumbnails']
+        for subdir in output_subdirs:
+            ensure(self.dirs['output'] / subdir)
     
-    def _load_api_configs(self) -> Dict[str, Any]:
-        """Load API configurations"""
+    @cached_property
+    def apis(self) -> Dict[str, Any]:
+        """API configurations, loaded on first access"""
         return {
             'youtube': {
                 'api_key': os.getenv('YOUTUBE_API_KEY', ''),
@@ -221,14 +330,17 @@ class Config:
             }
         }
     
-    def _load_channels(self) -> List[ChannelConfig]:
-        """Load channel configurations from file"""
+    @cached_property
+    def channels(self) -> List[ChannelConfig]:
+        """Channel configurations, loaded from file on first access"""
         channels_file = self.dirs['data'] / 'channels.json'
         
         if channels_file.exists():
             try:
-                with open(channels_file, 'r') as f:
-                    channels_data = json.load(f)
+                if HAS_ORJSON:
+                    channels_data = orjson.loads(channels_file.read_bytes())
+                else:
+                    channels_data = json.loads(channels_file.read_text())
                 
                 channels = []
                 for channel_data in channels_data:
@@ -241,7 +353,7 @@ class Config:
                     ))
                 return channels
             except Exception as e:
-                print(f"Warning: Could not load channels from {channels_file}: {e}")
+                logger.warning(f"Could not load channels from {channels_file}: {e}")
         
         # Default channel if none exist
         return [ChannelConfig(
@@ -253,9 +365,8 @@ class Config:
     def _load_yaml_config(self, config_path: str):
         """Load configuration from YAML file"""
         try:
-            with open(config_path, 'r') as f:
-                config_data = yaml.safe_load(f)
-                
+            config_data = load_yaml_cached(config_path)
+            
             if config_data:
                 # Update module configurations
                 if 'modules' in config_data:
@@ -264,50 +375,52 @@ class Config:
                             if 'enabled' in module_config:
                                 self.modules[module_name].enabled = module_config['enabled']
                             if 'provider_type' in module_config:
-                                self.modules[module_name].provider_type = ProviderType(module_config['provider_type'])
+                                self.modules[module_name].provider_type = _PT_BY_VALUE.get(
+                                    module_config['provider_type'], ProviderType.SIMPLE)
+                    self._recompute_use_mcp()
                 
                 # Update pipeline config
                 if 'pipeline' in config_data:
                     pipeline_data = config_data['pipeline']
                     for key, value in pipeline_data.items():
-                        if hasattr(self.pipeline, key):
+                        if key in _PIPELINE_FIELDS:
                             setattr(self.pipeline, key, value)
                 
                 # Update YouTube config
                 if 'youtube' in config_data:
                     youtube_data = config_data['youtube']
                     for key, value in youtube_data.items():
-                        if hasattr(self.youtube, key):
+                        if key in _YOUTUBE_FIELDS:
                             setattr(self.youtube, key, value)
                 
                 # Update content config
                 if 'content' in config_data:
                     content_data = config_data['content']
                     for key, value in content_data.items():
-                        if hasattr(self.content, key):
+                        if key in _CONTENT_FIELDS:
                             setattr(self.content, key, value)
                             
         except Exception as e:
-            print(f"Warning: Could not load YAML config from {config_path}: {e}")
+            logger.warning(f"Could not load YAML config from {config_path}: {e}")
     
-    def _validate_config(self):
-        """Validate configuration settings"""
+    def validate(self) -> List[str]:
+        """Validate configuration settings and report any warnings"""
         warnings = []
         
         # Check required API keys based on enabled modules
-        if self.modules['script_generation'].enabled:
+        if self.mod(Module.SCRIPT_GENERATION).enabled:
             if not self.apis['cohere']['api_key'] and not self.apis['huggingface']['api_key']:
                 warnings.append("No AI API key configured (Cohere or Hugging Face needed for script generation)")
         
-        if self.modules['asset_gathering'].enabled:
+        if self.mod(Module.ASSET_GATHERING).enabled:
             if not self.apis['pexels']['api_key'] and not self.apis['unsplash']['api_key']:
                 warnings.append("No stock media API key configured (Pexels or Unsplash needed for asset gathering)")
         
-        if self.modules['voiceover'].enabled:
+        if self.mod(Module.VOICEOVER).enabled:
             if not self.apis['elevenlabs']['api_key']:
                 warnings.append("No ElevenLabs API key configured (needed for voiceover)")
         
-        if self.modules['youtube_upload'].enabled:
+        if self.mod(Module.YOUTUBE_UPLOAD).enabled:
             if not self.apis['youtube']['api_key']:
                 warnings.append("No YouTube API key configured (needed for upload)")
         
@@ -319,10 +432,10 @@ class Config:
             warnings.append(f"max_daily_uploads ({self.youtube.max_daily_uploads}) is high. YouTube may flag as spam.")
         
         # Log warnings
-        if warnings and self.debug:
-            print("Configuration warnings:")
-            for warning in warnings:
-                print(f"  ⚠️  {warning}")
+        if warnings:
+            logger.warning("Configuration warnings:\n  " + "\n  ".join(warnings))
+        
+        return warnings
     
     def save_channels(self):
         """Save channel configurations to file"""
@@ -338,35 +451,40 @@ class Config:
                 'branding': channel.branding
             })
         
-        with open(channels_file, 'w') as f:
-            json.dump(channels_data, f, indent=2)
+        if HAS_ORJSON:
+            payload = orjson.dumps(channels_data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        else:
+            payload = (json.dumps(channels_data, indent=2) + "\n").encode('utf-8')
+        
+        # Write-then-rename so a crash never leaves a truncated channels.json
+        tmp_file = channels_file.with_suffix('.json.tmp')
+        tmp_file.write_bytes(payload)
+        os.replace(tmp_file, channels_file)
+    
+    @cached_property
+    def _channels_by_name(self) -> Dict[str, ChannelConfig]:
+        """Channel lookup index (first channel wins on duplicate names)"""
+        index = {}
+        for channel in self.channels:
+            index.setdefault(channel.name, channel)
+        return index
     
     def add_channel(self, channel: ChannelConfig):
         """Add a new channel configuration"""
         self.channels.append(channel)
+        self._channels_by_name.setdefault(channel.name, channel)
+        self.__dict__.pop('_channels_dict', None)
         self.save_channels()
     
     def get_channel(self, name: str) -> Optional[ChannelConfig]:
         """Get channel configuration by name"""
-        for channel in self.channels:
-            if channel.name == name:
-                return channel
-        return None
+        return self._channels_by_name.get(name)
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert configuration to dictionary"""
+    @cached_property
+    def _static_dict(self) -> Dict[str, Any]:
+        """Sections of to_dict() that are fixed once the config is loaded"""
         return {
-            'environment': self.environment,
-            'debug': self.debug,
             'directories': {k: str(v) for k, v in self.dirs.items()},
-            'modules': {
-                name: {
-                    'enabled': config.enabled,
-                    'provider_type': config.provider_type.value,
-                    'mcp_server_url': config.mcp_server_url
-                }
-                for name, config in self.modules.items()
-            },
             'pipeline': {
                 'max_concurrent_jobs': self.pipeline.max_concurrent_jobs,
                 'job_timeout_minutes': self.pipeline.job_timeout_minutes,
@@ -383,15 +501,40 @@ class Config:
                 'default_duration': self.content.default_duration,
                 'min_quality_score': self.content.min_quality_score,
                 'max_title_length': self.content.max_title_length
-            },
-            'channels': [
-                {
-                    'name': channel.name,
-                    'niche': channel.niche,
-                    'quality_standard': channel.quality_standard.value
+            }
+        }
+    
+    @cached_property
+    def _channels_dict(self) -> List[Dict[str, Any]]:
+        """Channel summaries for to_dict(), rebuilt when channels are added"""
+        return [
+            {
+                'name': channel.name,
+                'niche': channel.niche,
+                'quality_standard': channel.quality_standard.value
+            }
+            for channel in self.channels
+        ]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert configuration to dictionary (nested values are shared, treat as read-only)"""
+        static = self._static_dict
+        return {
+            'environment': self.environment,
+            'debug': self.debug,
+            'directories': static['directories'],
+            'modules': {
+                name: {
+                    'enabled': config.enabled,
+                    'provider_type': config.provider_type.value,
+                    'mcp_server_url': config.mcp_server_url
                 }
-                for channel in self.channels
-            ]
+                for name, config in self.modules.items()
+            },
+            'pipeline': static['pipeline'],
+            'youtube': static['youtube'],
+            'content': static['content'],
+            'channels': self._channels_dict
         }
     
     def __str__(self) -> str:
@@ -402,11 +545,19 @@ class Config:
     @property
     def use_mcp(self) -> bool:
         """Check if any module is using MCP"""
-        return any(
-            module.provider_type == ProviderType.MCP 
-            for module in self.modules.values()
+        return self._use_mcp
+    
+    def _recompute_use_mcp(self):
+        """Refresh the cached use_mcp flag after module provider types change"""
+        self._use_mcp = any(
+            module.provider_type is ProviderType.MCP
+            for module in self.modules_arr
         )
     
+    def mod(self, module: Module) -> ModuleConfig:
+        """Get a module configuration by Module index"""
+        return self.modules_arr[module]
+    
     @property
     def is_production(self) -> bool:
         """Check if running in production environment"""
@@ -419,16 +570,31 @@ class Config:
 
 # Singleton instance for easy access
 _config_instance = None
+_config_lock = threading.Lock()
 
 def get_config(config_path: Optional[str] = None) -> Config:
     """Get configuration instance (singleton pattern)"""
     global _config_instance
-    if _config_instance is None:
-        _config_instance = Config(config_path)
-    return _config_instance
+    # Lock-free once initialized; the lock only guards the first construction
+    config = _config_instance
+    if config is not None:
+        return config
+    
+    with _config_lock:
+        if _config_instance is None:
+            config = Config(config_path)
+            if config.debug:
+                config.validate()
+            _config_instance = config
+        return _config_instance
 
 def reload_config(config_path: Optional[str] = None) -> Config:
     """Reload configuration from file"""
     global _config_instance
-    _config_instance = Config(config_path)
-    return _config_instance
+    # Build the new instance fully before publishing it to readers
+    config = Config(config_path)
+    if config.debug:
+        config.validate()
+    with _config_lock:
+        _config_instance = config
+    return config
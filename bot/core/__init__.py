@@ -11,6 +11,7 @@ This package contains the fundamental building blocks:
 """
 
 __all__ = [
+    'batcher',
     'circuit_breaker',
     'config_manager',
     'enhanced_pipeline',
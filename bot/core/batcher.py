@@ -0,0 +1,116 @@
+"""
+Micro-batching for async calls.
+
+Collects items submitted by concurrent coroutines over a short window and
+hands them to a handler in one call, resolving each submitter with its own
+result or exception. When the caller knows how many submitters are active,
+the batch goes out as soon as all of them have submitted.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+class AsyncBatcher:
+    """Group concurrent submissions into batched handler calls"""
+    
+    def __init__(self, handler: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_items: int = 8, timeout: float = 0.05,
+                 expected: Optional[Callable[[], int]] = None):
+        # handler(items) must return one result per item, in the same order;
+        # an exception in a slot fails only that item's submitter
+        self.handler = handler
+        self.max_items = max_items
+        self.timeout = timeout
+        # expected() is the number of submitters currently active; the timeout
+        # only covers one that is slow to submit or never does
+        self.expected = expected
+        self._items: List[Any] = []
+        self._futures: List[asyncio.Future] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+    
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result from the next batch"""
+        if self._closed:
+            raise RuntimeError("AsyncBatcher is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        
+        if len(self._items) >= self._batch_size():
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.timeout, self._flush)
+        
+        return await future
+    
+    def _batch_size(self) -> int:
+        """Items to wait for before flushing early"""
+        if self.expected is None:
+            return self.max_items
+        return max(1, min(self.max_items, self.expected()))
+    
+    async def close(self):
+        """Cancel the pending flush and in-flight batches, failing every waiting submitter"""
+        self._closed = True
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        futures, self._items, self._futures = self._futures, [], []
+        for future in futures:
+            if not future.done():
+                future.set_exception(RuntimeError("AsyncBatcher closed before the batch ran"))
+        
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _flush(self):
+        """Dispatch everything queued so far as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        if not self._items:
+            return
+        
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        
+        # Hold a reference so the task isn't garbage collected mid-flight
+        task = asyncio.create_task(self._run_batch(items, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(self, items: List[Any], futures: List[asyncio.Future]):
+        """Call the handler and fan results back out to the submitters"""
+        try:
+            results = await self.handler(items)
+            if len(results) != len(items):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(items)} items")
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Batch of {len(items)} items failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for future, result in zip(futures, results):
+            # A submitter may have been cancelled while the batch ran
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -6,44 +6,67 @@ Circuit breaker for external API calls.
 import asyncio
 import time
 from contextlib import contextmanager
+from enum import IntEnum
 from typing import Optional
 
+class CircuitState(IntEnum):
+    """Circuit breaker states"""
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
 class CircuitBreaker:
     def __init__(self, failure_threshold: int = 5, recovery_timeout: int = 60):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
+        self.recovery_timeout_ns = int(recovery_timeout * 1_000_000_000)
         self.failures = 0
-        self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
-        self.last_failure_time: Optional[float] = None
+        self.state = CircuitState.CLOSED
+        self.last_failure_time: Optional[int] = None  # time.monotonic_ns()
     
-    async def call(self, func, *args, **kwargs):
-        if self.state == "OPEN":
+    @property
+    def closed(self) -> bool:
+        """True when calls can go straight through (hot path check)"""
+        return self.state is CircuitState.CLOSED
+    
+    def check(self):
+        """Raise CircuitBreakerError if calls are currently blocked"""
+        if self.state is CircuitState.OPEN:
             # Check if recovery timeout has passed
-            if self.last_failure_time and (time.time() - self.last_failure_time) > self.recovery_timeout:
-                self.state = "HALF_OPEN"
+            if self.last_failure_time and (time.monotonic_ns() - self.last_failure_time) > self.recovery_timeout_ns:
+                self.state = CircuitState.HALF_OPEN
             else:
                 raise CircuitBreakerError("Circuit breaker is OPEN")
-        
-        try:
-            result = await func(*args, **kwargs)
-            if self.state == "HALF_OPEN":
-                # Successful call in HALF_OPEN state, reset
-                self.reset()
-            return result
-        except Exception as e:
-            self._record_failure()
-            raise e
     
-    def _record_failure(self):
+    def on_success(self):
+        """Record a successful call"""
+        if self.state is CircuitState.HALF_OPEN:
+            # Successful call in HALF_OPEN state, reset
+            self.reset()
+    
+    def on_failure(self):
+        """Record a failed call"""
         self.failures += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = time.monotonic_ns()
         
         if self.failures >= self.failure_threshold:
-            self.state = "OPEN"
+            self.state = CircuitState.OPEN
+    
+    async def call(self, func, *args, **kwargs):
+        self.check()
+        
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self.on_failure()
+            raise
+        
+        self.on_success()
+        return result
     
     def reset(self):
         self.failures = 0
-        self.state = "CLOSED"
+        self.state = CircuitState.CLOSED
         self.last_failure_time = None
 
 class CircuitBreakerError(Exception):
@@ -52,3 +75,13 @@ class CircuitBreakerError(Exception):
 # Example usage in a provider:
 # circuit_breaker = CircuitBreaker()
 # result = await circuit_breaker.call(api_function, arg1, arg2)
+#
+# Hot-path usage, skipping call()'s argument packing while CLOSED:
+# if circuit_breaker.closed:
+#     try:
+#         result = await api_function(arg1, arg2)
+#     except Exception:
+#         circuit_breaker.on_failure()
+#         raise
+# else:
+#     result = await circuit_breaker.call(api_function, arg1, arg2)
@@ -2,28 +2,105 @@
 Configuration manager for dynamic configuration updates
 """
 
+import os
+import logging
+import weakref
 import yaml
 import json
 from pathlib import Path
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 import asyncio
+import threading
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.observers.polling import PollingObserver
+from watchdog.events import PatternMatchingEventHandler
+
+from bot.config import load_yaml_cached
+
+logger = logging.getLogger(__name__)
+
+# inotify lets us watch the config file from the event loop without a watchdog thread
+try:
+    import inotify_simple
+    HAS_INOTIFY = True
+except ImportError:
+    HAS_INOTIFY = False
+
+# Prefer the LibYAML-backed dumper when PyYAML was built against it
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
+# Editors emit several events per save (temp file, rename, chmod); coalesce them
+RELOAD_DEBOUNCE = 0.2  # seconds
+
+# inotify doesn't see changes made by other clients of these filesystems
+NETWORK_FS_TYPES = frozenset({
+    'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', '9p', 'fuse.sshfs', 'afs', 'ceph', 'glusterfs'
+})
+DEFAULT_POLL_INTERVAL = 2.0  # seconds
+
+def is_network_fs(path: Path) -> bool:
+    """Best-effort check whether path lives on a network mount (Linux only)"""
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    
+    path = os.path.realpath(path)
+    best_mount, best_type = '', ''
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if path == mount_point or path.startswith(mount_point.rstrip('/') + '/'):
+            if len(mount_point) > len(best_mount):
+                best_mount, best_type = mount_point, fs_type
+    return best_type in NETWORK_FS_TYPES
+
+@lru_cache(maxsize=512)
+def _split_key(key: str) -> Tuple[str, ...]:
+    """Split a dotted config key, memoized for hot lookups"""
+    return tuple(key.split('.'))
 
 class ConfigManager:
     """Manage dynamic configuration updates"""
     
-    def __init__(self, config_path: Path):
+    def __init__(self, config_path: Path, poll_interval: Optional[float] = None):
         self.config_path = config_path
+        # Set to force polling; otherwise polling is only used on network mounts
+        self.poll_interval = poll_interval
         self.config = {}
+        # Resolvers returning the callback, or None once a bound method's owner is gone
         self.callbacks = []
         self.observer = None
+        self._inotify = None
+        self._watch_loop = None
+        self._pending_timer: Optional[threading.Timer] = None
+        self._pending_handle: Optional[asyncio.TimerHandle] = None
+        self._last_bytes = None  # raw file contents of the last load/save
+        self._stat_key: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of the loaded file
+        self._flat: Optional[Dict[str, Any]] = None  # "a.b.c" -> value, built on demand
         
-    def load_config(self):
-        """Load configuration from YAML file"""
+    def load_config(self, snapshot: Optional[Tuple[os.stat_result, bytes]] = None):
+        """Load configuration from YAML file
+        
+        snapshot is a (stat, bytes) pair from _read_file(), for callers that already read it.
+        """
         try:
-            with open(self.config_path, 'r') as f:
-                self.config = yaml.safe_load(f) or {}
+            if snapshot is None:
+                if self._file_stat_key() == self._stat_key:
+                    return self.config
+                snapshot = self._read_file()
+            st, raw = snapshot
+            
+            # Parse the bytes we hold, so config, _stat_key and _last_bytes describe one version
+            self.config = load_yaml_cached(self.config_path, raw, st) or {}
+            self._stat_key = (st.st_mtime_ns, st.st_size)
+            # Lets the watcher recognise a touch or re-save that doesn't change the content
+            self._last_bytes = raw
+            self._flat = None
             return self.config
         except Exception as e:
             print(f"Error loading config: {e}")
@@ -32,29 +109,51 @@ class ConfigManager:
     def save_config(self):
         """Save configuration to YAML file"""
         try:
-            with open(self.config_path, 'w') as f:
-                yaml.dump(self.config, f, default_flow_style=False)
+            data = yaml.dump(self.config, Dumper=_YamlDumper, default_flow_style=False, encoding='utf-8')
+            self.config_path.write_bytes(data)
+            # Our own write shouldn't trigger a watcher reload
+            self._last_bytes = data
+            self._stat_key = self._file_stat_key()
             return True
         except Exception as e:
             print(f"Error saving config: {e}")
             return False
     
+    def _file_stat_key(self) -> Tuple[int, int]:
+        """Cheap change detector for the config file"""
+        st = self.config_path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _read_file(self) -> Tuple[os.stat_result, bytes]:
+        """Read the config file once, with the stat of the same open file"""
+        with open(self.config_path, 'rb') as f:
+            return os.fstat(f.fileno()), f.read()
+    
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value"""
-        keys = key.split('.')
-        value = self.config
+        if self._flat is None:
+            self._flat = self._flatten(self.config)
+        return self._flat.get(key, default)
+    
+    @staticmethod
+    def _flatten(config: Dict, prefix: str = '', flat: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Map every dotted key path (leaves and sections) to its value"""
+        if flat is None:
+            flat = {}
         
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+        for k, v in config.items():
+            if not isinstance(k, str):
+                continue
+            full_key = f"{prefix}.{k}" if prefix else k
+            flat[full_key] = v
+            if isinstance(v, dict):
+                ConfigManager._flatten(v, full_key, flat)
         
-        return value
+        return flat
     
     def set(self, key: str, value: Any):
         """Set configuration value"""
-        keys = key.split('.')
+        keys = _split_key(key)
         config = self.config
         
         for k in keys[:-1]:
@@ -63,6 +162,7 @@ class ConfigManager:
             config = config[k]
         
         config[keys[-1]] = value
+        self._flat = None
         
         # Save and notify
         self.save_config()
@@ -70,43 +170,143 @@ class ConfigManager:
     
     def add_callback(self, callback):
         """Add callback for configuration changes"""
-        self.callbacks.append(callback)
+        # Bound methods are held weakly so a registration doesn't keep its owner alive;
+        # plain functions and lambdas are held strongly, as they often have no other reference
+        if hasattr(callback, '__self__') and hasattr(callback, '__func__'):
+            self.callbacks.append(weakref.WeakMethod(callback))
+        else:
+            self.callbacks.append(lambda: callback)
     
     def notify_callbacks(self, key: str, value: Any):
         """Notify all callbacks of configuration change"""
-        for callback in self.callbacks:
+        # Iterate a snapshot: callbacks may add callbacks while we notify
+        dead = False
+        for resolve in tuple(self.callbacks):
+            callback = resolve()
+            if callback is None:
+                dead = True
+                continue
             try:
                 callback(key, value)
-            except Exception as e:
-                print(f"Error in config callback: {e}")
+            except Exception:
+                logger.exception(f"Error in config callback for {key}")
+        
+        if dead:
+            self.callbacks = [resolve for resolve in self.callbacks if resolve() is not None]
     
     def start_watching(self):
         """Start watching for configuration file changes"""
-        class ConfigHandler(FileSystemEventHandler):
-            def __init__(self, manager):
-                self.manager = manager
-            
-            def on_modified(self, event):
-                if event.src_path == str(self.manager.config_path):
-                    print(f"Config file modified: {event.src_path}")
-                    old_config = self.manager.config.copy()
-                    self.manager.load_config()
-                    
-                    # Find changed keys
-                    changed_keys = self.find_changed_keys(old_config, self.manager.config)
-                    for key in changed_keys:
-                        self.manager.notify_callbacks(key, self.manager.get(key))
-        
-        self.observer = Observer()
-        event_handler = ConfigHandler(self)
+        poll_interval = self.poll_interval or self.get('config_watcher.poll_interval')
+        if not poll_interval and is_network_fs(self.config_path.parent):
+            poll_interval = DEFAULT_POLL_INTERVAL
+        
+        if not poll_interval and HAS_INOTIFY and self._start_inotify_watch():
+            return
+        
+        # Let watchdog drop events for other files before they reach our callback
+        event_handler = PatternMatchingEventHandler(
+            patterns=[self.config_path.name],
+            ignore_directories=True,
+            case_sensitive=True
+        )
+        on_change = lambda event: self._schedule_reload()
+        event_handler.on_modified = on_change
+        # Editors that save via temp file + rename only produce a move event
+        event_handler.on_moved = on_change
+        
+        if poll_interval:
+            self.observer = PollingObserver(timeout=poll_interval)
+        else:
+            self.observer = Observer()
         self.observer.schedule(event_handler, path=str(self.config_path.parent), recursive=False)
         self.observer.start()
     
+    def _start_inotify_watch(self) -> bool:
+        """Watch the config directory via an inotify fd on the running event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to attach the fd to; use the watchdog thread instead
+            return False
+        
+        flags = inotify_simple.flags
+        self._inotify = inotify_simple.INotify()
+        self._inotify.add_watch(
+            str(self.config_path.parent),
+            flags.MODIFY | flags.CLOSE_WRITE | flags.MOVED_TO
+        )
+        loop.add_reader(self._inotify.fileno(), self._on_inotify_readable)
+        self._watch_loop = loop
+        return True
+    
+    def _on_inotify_readable(self):
+        """Drain pending inotify events and reload if any touched the config file"""
+        events = self._inotify.read(timeout=0)
+        if any(event.name == self.config_path.name for event in events):
+            if self._pending_handle:
+                self._pending_handle.cancel()
+            self._pending_handle = self._watch_loop.call_later(RELOAD_DEBOUNCE, self._debounced_reload)
+    
+    def _schedule_reload(self):
+        """Restart the debounce timer from a watchdog thread event"""
+        if self._pending_timer:
+            self._pending_timer.cancel()
+        self._pending_timer = threading.Timer(RELOAD_DEBOUNCE, self._debounced_reload)
+        self._pending_timer.daemon = True
+        self._pending_timer.start()
+    
+    def _debounced_reload(self):
+        """Reload once a burst of file events has settled"""
+        self._pending_timer = None
+        self._pending_handle = None
+        self.reload_from_disk()
+    
+    def reload_from_disk(self):
+        """Reload the config file and notify callbacks of changed keys"""
+        try:
+            stat_key = self._file_stat_key()
+            if stat_key == self._stat_key:
+                return
+            st, raw = self._read_file()
+        except OSError as e:
+            print(f"Error reading config: {e}")
+            return
+        
+        # Editors often emit several events per save; skip if content is unchanged
+        if raw == self._last_bytes:
+            self._stat_key = (st.st_mtime_ns, st.st_size)
+            return
+        self._last_bytes = raw
+        
+        print(f"Config file modified: {self.config_path}")
+        # load_config() rebinds self.config, so the old dict stays intact without a copy
+        old_config = self.config
+        self.load_config((st, raw))
+        
+        # Find changed keys
+        changed_keys = self.find_changed_keys(old_config, self.config)
+        for key in changed_keys:
+            self.notify_callbacks(key, self.get(key))
+    
     def stop_watching(self):
         """Stop watching for configuration file changes"""
+        if self._pending_timer:
+            self._pending_timer.cancel()
+            self._pending_timer = None
+        if self._pending_handle:
+            self._pending_handle.cancel()
+            self._pending_handle = None
+        
+        if self._inotify:
+            self._watch_loop.remove_reader(self._inotify.fileno())
+            self._inotify.close()
+            self._inotify = None
+            self._watch_loop = None
+        
         if self.observer:
             self.observer.stop()
             self.observer.join()
+            self.observer = None
     
     @staticmethod
     def find_changed_keys(old_dict: Dict, new_dict: Dict, prefix: str = '') -> list:
@@ -15,9 +15,16 @@ Orchestrates the complete video creation workflow:
 import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import json
+import time
+import heapq
+import hashlib
+import weakref
+from collections import defaultdict
+
+from bot.core.batcher import AsyncBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +37,53 @@ except ImportError:
     logger.warning("Provider modules not available, using fallbacks")
     HAS_PROVIDERS = False
 
+# NumPy is optional; asset ranking falls back to heapq without it
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# One ProviderFactory per config object, shared by pipelines built from it
+_provider_factories: "weakref.WeakValueDictionary[int, ProviderFactory]" = weakref.WeakValueDictionary()
+
+# How many holders each shared factory has; the last to release it closes it
+_provider_factory_users: "weakref.WeakKeyDictionary[ProviderFactory, int]" = weakref.WeakKeyDictionary()
+
+def get_provider_factory(config):
+    """Return the shared ProviderFactory for config, creating it on first use
+    
+    Each call takes a reference; give it back with release_provider_factory().
+    """
+    if not HAS_PROVIDERS:
+        return None
+    
+    # The factory holds config, so a live entry can't refer to a recycled id
+    factory = _provider_factories.get(id(config))
+    if factory is None:
+        factory = ProviderFactory(config)
+        _provider_factories[id(config)] = factory
+    _provider_factory_users[factory] = _provider_factory_users.get(factory, 0) + 1
+    return factory
+
+async def release_provider_factory(factory):
+    """Drop a reference taken by get_provider_factory(), closing the factory after the last one"""
+    users = _provider_factory_users.get(factory, 0) - 1
+    if users > 0:
+        _provider_factory_users[factory] = users
+        return
+    
+    _provider_factory_users.pop(factory, None)
+    for key, shared in list(_provider_factories.items()):
+        if shared is factory:
+            del _provider_factories[key]
+    await factory.close()
+
 # Define basic data classes if not available from providers
 class Trend:
     """Trend data class"""
+    __slots__ = ("topic", "score", "source", "metadata")
+    
     def __init__(self, topic: str, score: float = 0.0, source: str = "", metadata: Dict = None):
         self.topic = topic
         self.score = score
@@ -41,6 +92,8 @@ class Trend:
 
 class Script:
     """Script data class"""
+    __slots__ = ("content", "duration_seconds", "metadata")
+    
     def __init__(self, content: str, duration_seconds: int = 45, metadata: Dict = None):
         self.content = content
         self.duration_seconds = duration_seconds
@@ -48,14 +101,28 @@ class Script:
 
 class Asset:
     """Asset data class"""
+    __slots__ = ("url", "asset_type", "duration_seconds", "metadata")
+    
     def __init__(self, url: str, asset_type: str, duration_seconds: float = 0.0, metadata: Dict = None):
         self.url = url
         self.asset_type = asset_type
         self.duration_seconds = duration_seconds
         self.metadata = metadata or {}
 
+class StageError(Exception):
+    """A pipeline stage failed"""
+    def __init__(self, stage: str, error: Any):
+        super().__init__(f"Stage {stage} failed: {error}")
+        self.stage = stage
+
 class PipelineJob:
     """Pipeline job data container"""
+    __slots__ = (
+        "job_id", "job_type", "data", "trend_data", "script_result", "asset_result",
+        "voiceover_result", "video_result", "thumbnail_result", "quality_score",
+        "status", "error", "created_at", "completed_at", "completed_at_mono"
+    )
+    
     def __init__(self, job_id: str, job_type: str, data: Dict[str, Any]):
         self.job_id = job_id
         self.job_type = job_type
@@ -71,24 +138,62 @@ class PipelineJob:
         self.error: Optional[str] = None
         self.created_at = datetime.utcnow()
         self.completed_at: Optional[datetime] = None
+        self.completed_at_mono: Optional[float] = None  # time.monotonic(), for age checks
 
 class EnhancedPipeline:
     """Enhanced pipeline using provider pattern"""
     
-    def __init__(self, config, db, state_manager, job_queue, provider_factory=None):
+    def __init__(self, config, db, state_manager, job_queue, provider_factory=None, metrics=None):
         self.config = config
         self.db = db
         self.state_manager = state_manager
         self.job_queue = job_queue
-        self.provider_factory = provider_factory or ProviderFactory(config)
+        # Optional health.Metrics (HealthChecker.metrics_data) reported by /metrics
+        self.metrics = metrics
+        self.provider_factory = provider_factory or get_provider_factory(config)
+        # A factory passed in belongs to the caller; a shared one is released on shutdown
+        self._factory_acquired = provider_factory is None and self.provider_factory is not None
         
         # Provider instances
         self.providers: Dict[str, Any] = {}
         
         # Pipeline state
         self.running = False
-        self.processing_task: Optional[asyncio.Task] = None
+        self._workers: List[asyncio.Task] = []
+        self.intake_task: Optional[asyncio.Task] = None
+        self.cleanup_task: Optional[asyncio.Task] = None
+        self.state_flush_task: Optional[asyncio.Task] = None
         self.active_jobs: Dict[str, PipelineJob] = {}
+        # Job IDs waiting to be processed, in arrival order
+        self._pending_ids: asyncio.Queue = asyncio.Queue()
+        # Stage progress waiting to be written to the state manager, keyed by job ID
+        self._state_buffer: Dict[str, List[tuple]] = defaultdict(list)
+        self._state_dirty = asyncio.Event()
+        
+        # Asset searches from concurrent jobs are grouped into bulk provider calls
+        # Jobs inside the asset search; each submits once to each batcher, so a batch
+        # can go out as soon as all of them have
+        self._asset_searches = 0
+        self._video_search = AsyncBatcher(self._search_videos_batch, expected=lambda: self._asset_searches)
+        self._image_search = AsyncBatcher(self._search_images_batch, expected=lambda: self._asset_searches)
+        
+        # Per-job output directories, created once in initialize()
+        output_root = self.config.dirs['output']
+        self.audio_dir = output_root / 'audio'
+        self.video_dir = output_root / 'video'
+        self.thumbnail_dir = output_root / 'thumbnails'
+        
+        # Groups run in order; each group is a set of lanes that run concurrently,
+        # and the stages within a lane run in order. Asset gathering only needs
+        # the trend, so it overlaps with script generation and voiceover.
+        self._stage_groups = (
+            ((("trend_detection", self._process_trend_detection),),),
+            ((("script_generation", self._process_script_generation),
+              ("voiceover_generation", self._process_voiceover)),
+             (("asset_gathering", self._process_asset_gathering),)),
+            ((("video_assembly", self._process_video_assembly),),),
+            ((("quality_check", self._process_quality_check),),),
+        )
         
         # Statistics
         self.stats = {
@@ -107,9 +212,18 @@ class EnhancedPipeline:
         else:
             logger.warning("Running without provider initialization")
         
+        await asyncio.to_thread(self._create_output_dirs)
+        
         # Start pipeline processor
         self.running = True
-        self.processing_task = asyncio.create_task(self._run_pipeline())
+        # Jobs are I/O bound, so several can be in flight at once
+        worker_count = max(1, self.config.pipeline.max_concurrent_jobs)
+        self._workers = [
+            asyncio.create_task(self._run_pipeline(i)) for i in range(worker_count)
+        ]
+        self.intake_task = asyncio.create_task(self._run_queue_intake())
+        self.cleanup_task = asyncio.create_task(self._run_cleanup())
+        self.state_flush_task = asyncio.create_task(self._run_state_flusher())
         
         logger.info("Enhanced pipeline initialized")
         return self
@@ -122,31 +236,25 @@ class EnhancedPipeline:
         try:
             # Initialize provider factory
             if not self.provider_factory:
-                self.provider_factory = ProviderFactory(self.config)
+                self.provider_factory = get_provider_factory(self.config)
+                self._factory_acquired = True
             
             # Create providers
-            provider_types = [
-                ('trend', 'create_trend_provider'),
-                ('script', 'create_script_provider'),
-                ('asset', 'create_asset_provider'),
-                ('voiceover', 'create_voiceover_provider'),
-                ('video', 'create_video_provider'),
-            ]
+            factory = self.provider_factory
+            provider_types = (
+                ('trend', factory.create_trend_provider),
+                ('script', factory.create_script_provider),
+                ('fact_check', factory.create_fact_check_provider),
+                ('asset', factory.create_asset_provider),
+                ('voiceover', factory.create_voiceover_provider),
+                ('video', factory.create_video_provider),
+            )
             
-            for provider_name, method_name in provider_types:
-                try:
-                    method = getattr(self.provider_factory, method_name)
-                    provider = await method()
-                    self.providers[provider_name] = provider
-                    
-                    # Initialize provider if it has initialize method
-                    if hasattr(provider, 'initialize'):
-                        await provider.initialize()
-                    
-                    logger.info(f"Initialized {provider_name} provider")
-                except Exception as e:
-                    logger.error(f"Failed to initialize {provider_name} provider: {e}")
-                    self.providers[provider_name] = None
+            # Providers are independent, so start them all at once
+            # (_init_provider catches its own errors, so one failure doesn't cancel the rest)
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(self._init_provider(name, create)) for name, create in provider_types]
+            self.providers.update(task.result() for task in tasks)
             
             # Check which providers are available
             available_providers = [name for name, provider in self.providers.items() if provider]
@@ -155,6 +263,21 @@ class EnhancedPipeline:
         except Exception as e:
             logger.error(f"Error initializing providers: {e}")
     
+    async def _init_provider(self, provider_name: str, create):
+        """Create and initialize one provider; returns (name, provider or None)"""
+        try:
+            provider = await create()
+            
+            # Initialize provider if it has initialize method
+            if hasattr(provider, 'initialize'):
+                await provider.initialize()
+            
+            logger.info(f"Initialized {provider_name} provider")
+            return provider_name, provider
+        except Exception as e:
+            logger.error(f"Failed to initialize {provider_name} provider: {e}")
+            return provider_name, None
+    
     async def create_video_job(self, topic: str = None, channel: str = None) -> str:
         """Create a new video creation job"""
         job_data = {
@@ -178,7 +301,12 @@ class EnhancedPipeline:
         await self.state_manager.create_job_state(job_id, "video_creation")
         await self.state_manager.update_job_status(job_id, "pending")
         
+        # Wake the processor
+        await self._pending_ids.put(job_id)
+        
         self.stats["total_jobs"] += 1
+        if self.metrics is not None:
+            self.metrics.increment('jobs_queued')
         logger.info(f"Created video job {job_id} for topic: {topic}")
         
         return job_id
@@ -189,94 +317,88 @@ class EnhancedPipeline:
             return {"success": False, "error": f"Job {job_id} not found"}
         
         job = self.active_jobs[job_id]
+        started = time.monotonic()
         
         try:
-            # Update state
-            await self.state_manager.update_job_status(job_id, "processing")
+            # Claim the job before yielding so no other worker picks it up
             job.status = "processing"
+            await self.state_manager.update_job_status(job_id, "processing")
             
             # Execute pipeline stages
             result = await self._execute_pipeline(job)
+            await self._flush_state_updates()
             
             if result["success"]:
                 job.status = "completed"
                 job.completed_at = datetime.utcnow()
+                job.completed_at_mono = time.monotonic()
                 await self.state_manager.update_job_status(job_id, "completed", result)
                 self.stats["completed_jobs"] += 1
                 self.stats["total_videos_created"] += 1
+                self._record_job_metrics(True, started)
             else:
                 job.status = "failed"
                 job.error = result.get("error", "Unknown error")
                 job.completed_at = datetime.utcnow()
+                job.completed_at_mono = time.monotonic()
                 await self.state_manager.update_job_status(job_id, "failed", None, job.error)
                 self.stats["failed_jobs"] += 1
+                self._record_job_metrics(False, started)
             
             # Cleanup
-            if job_id in self.active_jobs:
-                del self.active_jobs[job_id]
+            self.active_jobs.pop(job_id, None)
             
             return result
             
         except Exception as e:
             logger.error(f"Error processing job {job_id}: {e}")
+            await self._flush_state_updates()
             
             job.status = "failed"
             job.error = str(e)
             job.completed_at = datetime.utcnow()
+            job.completed_at_mono = time.monotonic()
             await self.state_manager.update_job_status(job_id, "failed", None, str(e))
             self.stats["failed_jobs"] += 1
+            self._record_job_metrics(False, started)
             
-            if job_id in self.active_jobs:
-                del self.active_jobs[job_id]
+            self.active_jobs.pop(job_id, None)
             
             return {"success": False, "error": str(e)}
     
+    def _record_job_metrics(self, success: bool, started: float):
+        """Report a finished job to the health endpoint's counters, if attached"""
+        if self.metrics is None:
+            return
+        if success:
+            self.metrics.increment('jobs_processed')
+            self.metrics.increment('videos_created')
+        else:
+            self.metrics.increment('jobs_failed')
+        self.metrics.record_processing_time(time.monotonic() - started)
+    
     async def _execute_pipeline(self, job: PipelineJob) -> Dict[str, Any]:
         """Execute all pipeline stages for a job"""
-        stages = [
-            ("trend_detection", self._process_trend_detection),
-            ("script_generation", self._process_script_generation),
-            ("asset_gathering", self._process_asset_gathering),
-            ("voiceover_generation", self._process_voiceover),
-            ("video_assembly", self._process_video_assembly),
-            ("quality_check", self._process_quality_check),
-        ]
-        
-        for stage_name, stage_func in stages:
-            try:
-                # Update pipeline state
-                await self.state_manager.update_pipeline_stage(
-                    f"job_{job.job_id}",
-                    stage_name,
-                    progress=0.0
-                )
-                
-                # Execute stage
-                logger.info(f"Executing stage {stage_name} for job {job.job_id}")
-                stage_result = await stage_func(job)
-                
-                if not stage_result.get("success", True):
-                    return {
-                        "success": False,
-                        "error": f"Stage {stage_name} failed: {stage_result.get('error')}",
-                        "failed_stage": stage_name
-                    }
-                
-                # Update progress
-                await self.state_manager.update_pipeline_stage(
-                    f"job_{job.job_id}",
-                    stage_name,
-                    progress=1.0,
-                    metadata={"result": stage_result}
-                )
+        try:
+            for group in self._stage_groups:
+                if len(group) == 1:
+                    await self._execute_lane(job, group[0])
+                    continue
                 
-            except Exception as e:
-                logger.error(f"Stage {stage_name} failed for job {job.job_id}: {e}")
-                return {
-                    "success": False,
-                    "error": f"Stage {stage_name} failed: {str(e)}",
-                    "failed_stage": stage_name
-                }
+                # A failing stage cancels the other lanes of its group
+                try:
+                    async with asyncio.TaskGroup() as tg:
+                        for lane in group:
+                            tg.create_task(self._execute_lane(job, lane))
+                except ExceptionGroup as eg:
+                    raise eg.exceptions[0]
+        
+        except StageError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "failed_stage": e.stage
+            }
         
         # All stages completed successfully
         return {
@@ -288,6 +410,81 @@ class EnhancedPipeline:
             "message": "Pipeline execution completed successfully"
         }
     
+    async def _execute_lane(self, job: PipelineJob, lane):
+        """Run a sequence of dependent stages"""
+        for stage_name, stage_func in lane:
+            await self._execute_stage(job, stage_name, stage_func)
+    
+    async def _execute_stage(self, job: PipelineJob, stage_name: str, stage_func):
+        """Run one stage with state tracking; raises StageError on failure"""
+        # Update pipeline state
+        self._buffer_stage_update(job, stage_name, 0.0)
+        
+        # Execute stage
+        logger.info(f"Executing stage {stage_name} for job {job.job_id}")
+        try:
+            stage_result = await stage_func(job)
+        except Exception as e:
+            logger.error(f"Stage {stage_name} failed for job {job.job_id}: {e}")
+            raise StageError(stage_name, str(e)) from e
+        
+        if not stage_result.get("success", True):
+            raise StageError(stage_name, stage_result.get('error'))
+        
+        # Update progress
+        self._buffer_stage_update(job, stage_name, 1.0, {"result": stage_result})
+    
+    def _buffer_stage_update(self, job: PipelineJob, stage_name: str, progress: float,
+                             metadata: Optional[Dict[str, Any]] = None):
+        """Queue a stage update for the next batched state manager write"""
+        self._state_buffer[f"job_{job.job_id}"].append((stage_name, progress, metadata))
+        self._state_dirty.set()
+    
+    async def _flush_state_updates(self):
+        """Write all buffered stage updates in one state manager call"""
+        if not self._state_buffer:
+            return
+        
+        updates = self._state_buffer
+        self._state_buffer = defaultdict(list)
+        self._state_dirty.clear()
+        
+        try:
+            await self.state_manager.update_pipeline_stages_batch(updates)
+        except Exception as e:
+            logger.error(f"Failed to write pipeline stage updates: {e}")
+    
+    async def _run_state_flusher(self, interval: float = 0.2):
+        """Flush buffered stage updates shortly after they arrive"""
+        while self.running:
+            try:
+                # Only wakes while there are updates to write
+                await self._state_dirty.wait()
+                await asyncio.sleep(interval)
+                await self._flush_state_updates()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in pipeline state flusher: {e}")
+    
+    def _create_output_dirs(self):
+        """Create the output directories every job writes into"""
+        for path in (self.audio_dir, self.video_dir, self.thumbnail_dir):
+            path.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def _content_key(*parts: str) -> str:
+        """Short stable hash of a stage's inputs, used in output file names"""
+        return hashlib.blake2b('\0'.join(parts).encode(), digest_size=8).hexdigest()
+    
+    @staticmethod
+    def _file_size(path: Path) -> Optional[int]:
+        """Size of a file, or None if it doesn't exist"""
+        try:
+            return path.stat().st_size
+        except OSError:
+            return None
+    
     async def _process_trend_detection(self, job: PipelineJob) -> Dict[str, Any]:
         """Process trend detection stage"""
         topic = job.data.get("topic")
@@ -320,10 +517,16 @@ class EnhancedPipeline:
                     else:
                         return {"success": False, "error": "No valid trends found"}
                 
+                # Runners-up are kept column-wise; consumers usually want just one field
+                alternatives = trends[1:3]
                 job.trend_data = {
                     "trend": selected,
                     "validation": validation,
-                    "alternatives": trends[1:3] if len(trends) > 1 else []
+                    "alternatives": {
+                        "topic": [t.topic for t in alternatives],
+                        "score": [t.score for t in alternatives],
+                        "source": [t.source for t in alternatives]
+                    }
                 }
                 
                 return {"success": True, "trend": selected.topic}
@@ -353,9 +556,21 @@ class EnhancedPipeline:
                     duration_seconds=self.config.content.default_duration
                 )
                 
-                # Improve script
                 improved = await provider.improve_script(script)
                 
+                # Fact check the improved text, since that's what gets stored and rendered
+                fact_checker = self.providers.get("fact_check")
+                if fact_checker:
+                    try:
+                        fact_check = await fact_checker.fact_check(improved.content)
+                    except Exception as e:
+                        # A failed fact check shouldn't throw away the script
+                        logger.warning(f"Fact check failed for job {job.job_id}: {e}")
+                    else:
+                        if improved.metadata is None:
+                            improved.metadata = {}
+                        improved.metadata["fact_check"] = fact_check
+                
                 job.script_result = improved
                 return {"success": True, "script_length": len(improved.content)}
                 
@@ -378,33 +593,32 @@ class EnhancedPipeline:
     
     async def _process_asset_gathering(self, job: PipelineJob) -> Dict[str, Any]:
         """Process asset gathering stage"""
-        if not job.trend_data or not job.script_result:
-            return {"success": False, "error": "Missing trend or script data"}
+        if not job.trend_data:
+            return {"success": False, "error": "No trend data available"}
         
         trend = job.trend_data["trend"]
         
         if "asset" in self.providers and self.providers["asset"]:
             try:
-                provider = self.providers["asset"]
-                
-                # Search for video assets
-                videos = await provider.search_videos(
-                    query=trend.topic,
-                    duration_range=(3, 8),
-                    limit=5
-                )
-                
-                # Search for image assets
-                images = await provider.search_images(
-                    query=trend.topic,
-                    limit=10
-                )
+                # Search for video and image assets concurrently, batched with other jobs;
+                # if either search fails the other is cancelled
+                self._asset_searches += 1
+                try:
+                    async with asyncio.TaskGroup() as tg:
+                        video_task = tg.create_task(self._video_search.submit(trend.topic))
+                        image_task = tg.create_task(self._image_search.submit(trend.topic))
+                except ExceptionGroup as eg:
+                    raise eg.exceptions[0]
+                finally:
+                    self._asset_searches -= 1
+                videos, images = video_task.result(), image_task.result()
                 
+                best_videos = self._rank_assets(videos, 1)
                 job.asset_result = {
                     "videos": videos,
                     "images": images,
-                    "selected_video": videos[0] if videos else None,
-                    "selected_images": images[:3] if images else []
+                    "selected_video": best_videos[0] if best_videos else None,
+                    "selected_images": self._rank_assets(images, 3)
                 }
                 
                 return {"success": True, "assets_found": len(videos) + len(images)}
@@ -422,6 +636,37 @@ class EnhancedPipeline:
         
         return {"success": True, "assets_found": 0, "warning": "Using fallback (no assets)"}
     
+    async def _search_videos_batch(self, queries: List[str]) -> List[List[Any]]:
+        """Video search for a batch of topics; a failed topic's slot holds its exception"""
+        return await self.providers["asset"].search_videos_bulk(queries, duration_range=(3, 8), limit=5)
+    
+    async def _search_images_batch(self, queries: List[str]) -> List[List[Any]]:
+        """Image search for a batch of topics; a failed topic's slot holds its exception"""
+        return await self.providers["asset"].search_images_bulk(queries, limit=10)
+    
+    @staticmethod
+    def _rank_assets(assets: List[Any], k: int) -> List[Any]:
+        """Top k assets by metadata score; provider order breaks ties"""
+        n = len(assets) if assets else 0
+        if n == 0 or k <= 0:
+            return []
+        k = min(k, n)
+        
+        score_iter = (float((asset.metadata or {}).get("score", 0.0)) for asset in assets)
+        
+        if not HAS_NUMPY:
+            scores = list(score_iter)
+            return [assets[i] for i in heapq.nsmallest(k, range(n), key=lambda i: -scores[i])]
+        
+        # Scores as one contiguous array, selected in O(n) with a partition
+        scores = np.fromiter(score_iter, dtype=np.float64, count=n)
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        idx = np.concatenate((above, ties))
+        idx = idx[np.lexsort((idx, -scores[idx]))]
+        return [assets[i] for i in idx]
+    
     async def _process_voiceover(self, job: PipelineJob) -> Dict[str, Any]:
         """Process voiceover generation stage"""
         if not job.script_result:
@@ -429,11 +674,11 @@ class EnhancedPipeline:
         
         script = job.script_result
         
-        # Create output directory
-        output_dir = self.config.dirs['output'] / 'audio'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        output_path = output_dir / f"{job.job_id}.mp3"
+        # Name the output after its input so a retried job can reuse it
+        output_path = self.audio_dir / f"{job.job_id}-{self._content_key(script.content)}.mp3"
+        if await asyncio.to_thread(self._file_size, output_path):
+            job.voiceover_result = output_path
+            return {"success": True, "voiceover_path": str(output_path), "reused": True}
         
         if "voiceover" in self.providers and self.providers["voiceover"]:
             try:
@@ -452,7 +697,7 @@ class EnhancedPipeline:
         # Fallback: create empty audio file or use TTS service
         # For now, just create placeholder
         try:
-            output_path.touch()
+            await asyncio.to_thread(output_path.touch)
             job.voiceover_result = output_path
             return {"success": True, "voiceover_path": str(output_path), "warning": "Placeholder audio"}
         except Exception as e:
@@ -463,11 +708,18 @@ class EnhancedPipeline:
         if not job.script_result or not job.voiceover_result:
             return {"success": False, "error": "Missing script or voiceover"}
         
-        # Create output directory
-        output_dir = self.config.dirs['output'] / 'video'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        output_path = output_dir / f"{job.job_id}.mp4"
+        # Name the output after its inputs so a retried job can reuse it
+        asset_result = job.asset_result or {}
+        asset_urls = [
+            getattr(asset, "url", "")
+            for asset in [asset_result.get("selected_video"), *asset_result.get("selected_images", [])]
+            if asset
+        ]
+        video_key = self._content_key(job.script_result.content, str(job.voiceover_result), *asset_urls)
+        output_path = self.video_dir / f"{job.job_id}-{video_key}.mp4"
+        if await asyncio.to_thread(self._file_size, output_path):
+            job.video_result = output_path
+            return {"success": True, "video_path": str(output_path), "reused": True}
         
         if "video" in self.providers and self.providers["video"]:
             try:
@@ -495,14 +747,12 @@ class EnhancedPipeline:
         
         # Fallback: create placeholder video file
         try:
-            output_path.touch()
+            await asyncio.to_thread(output_path.touch)
             job.video_result = output_path
             
             # Also create placeholder thumbnail
-            thumbnail_dir = self.config.dirs['output'] / 'thumbnails'
-            thumbnail_dir.mkdir(parents=True, exist_ok=True)
-            thumbnail_path = thumbnail_dir / f"{job.job_id}.jpg"
-            thumbnail_path.touch()
+            thumbnail_path = self.thumbnail_dir / f"{job.job_id}.jpg"
+            await asyncio.to_thread(thumbnail_path.touch)
             job.thumbnail_result = thumbnail_path
             
             return {
@@ -516,32 +766,33 @@ class EnhancedPipeline:
     
     async def _process_quality_check(self, job: PipelineJob) -> Dict[str, Any]:
         """Process quality check stage"""
-        # Basic quality checks
-        checks = []
+        # Basic quality checks as (name, passed, message)
+        checks: List[Tuple[str, bool, str]] = []
         
         # Check script length
-        if job.script_result and job.script_result.content:
-            script_len = len(job.script_result.content)
+        script = job.script_result
+        if script is not None and script.content:
+            script_len = len(script.content)
             if script_len < 50:
-                checks.append(("script_too_short", f"Script only {script_len} characters"))
+                checks.append(("script_too_short", False, f"Script only {script_len} characters"))
             elif script_len > 1000:
-                checks.append(("script_too_long", f"Script {script_len} characters"))
+                checks.append(("script_too_long", False, f"Script {script_len} characters"))
             else:
-                checks.append(("script_length_ok", f"Script {script_len} characters"))
+                checks.append(("script_length_ok", True, f"Script {script_len} characters"))
         
-        # Check video file exists
-        if job.video_result and job.video_result.exists():
-            file_size = job.video_result.stat().st_size
+        # Check video file exists (one stat, off the event loop)
+        file_size = await asyncio.to_thread(self._file_size, job.video_result) if job.video_result else None
+        if file_size is not None:
             if file_size < 1024:  # 1KB
-                checks.append(("video_file_small", f"Video file only {file_size} bytes"))
+                checks.append(("video_file_small", False, f"Video file only {file_size} bytes"))
             else:
-                checks.append(("video_file_exists", f"Video file {file_size} bytes"))
+                checks.append(("video_file_exists", True, f"Video file {file_size} bytes"))
         else:
-            checks.append(("video_missing", "Video file not created"))
+            checks.append(("video_missing", False, "Video file not created"))
         
         # Calculate quality score (simple for now)
         total_checks = len(checks)
-        passed_checks = sum(1 for _, msg in checks if "ok" in msg.lower() or "exists" in msg.lower())
+        passed_checks = sum(1 for _, passed, _ in checks if passed)
         
         if total_checks > 0:
             job.quality_score = (passed_checks / total_checks) * 100
@@ -565,58 +816,71 @@ class EnhancedPipeline:
                 "passed": False
             }
     
-    async def _run_pipeline(self):
-        """Main pipeline processing loop"""
-        logger.info("Starting pipeline processor...")
+    async def _run_pipeline(self, worker_id: int = 0):
+        """Pipeline worker loop; several run concurrently"""
+        logger.info(f"Starting pipeline processor {worker_id}...")
         
         while self.running:
             try:
-                # Check for pending jobs
-                pending_jobs = [
-                    job_id for job_id, job in self.active_jobs.items()
-                    if job.status == "pending"
-                ]
+                # Sleeps until a job is queued rather than polling active_jobs
+                job_id = await self._pending_ids.get()
                 
-                if pending_jobs:
-                    # Process oldest pending job
-                    job_id = pending_jobs[0]
+                job = self.active_jobs.get(job_id)
+                if job and job.status == "pending":
                     await self.process_job(job_id)
-                else:
-                    # Check job queue for new jobs
-                    job_data = await self.job_queue.get_job(timeout=1.0)
-                    if job_data:
-                        job_id = job_data.get("job_id")
-                        if job_id and job_id not in self.active_jobs:
-                            # Create pipeline job from queue job
-                            pipeline_job = PipelineJob(
-                                job_id=job_id,
-                                job_type=job_data.get("type", "unknown"),
-                                data=job_data
-                            )
-                            self.active_jobs[job_id] = pipeline_job
-                            await self.state_manager.create_job_state(job_id, pipeline_job.job_type)
                 
-                # Cleanup old jobs
-                await self._cleanup_old_jobs()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in pipeline processor: {e}")
+        
+        logger.info(f"Pipeline processor {worker_id} stopped")
+    
+    async def _run_queue_intake(self):
+        """Move jobs from the job queue into the pipeline"""
+        while self.running:
+            try:
+                # Blocks until a job is eligible; shutdown() cancels the wait
+                job_data = await self.job_queue.get_job()
+                if not job_data:
+                    continue
                 
-                # Small sleep to prevent busy looping
-                await asyncio.sleep(0.5)
+                job_id = job_data.get("job_id")
+                if job_id and job_id not in self.active_jobs:
+                    # Create pipeline job from queue job
+                    pipeline_job = PipelineJob(
+                        job_id=job_id,
+                        job_type=job_data.get("type", "unknown"),
+                        data=job_data
+                    )
+                    self.active_jobs[job_id] = pipeline_job
+                    await self.state_manager.create_job_state(job_id, pipeline_job.job_type)
+                    await self._pending_ids.put(job_id)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in pipeline processor: {e}")
+                logger.error(f"Error in pipeline queue intake: {e}")
                 await asyncio.sleep(1.0)
-        
-        logger.info("Pipeline processor stopped")
+    
+    async def _run_cleanup(self, interval: float = 3600):
+        """Periodically drop finished jobs from active_jobs"""
+        while self.running:
+            try:
+                await asyncio.sleep(interval)
+                await self._cleanup_old_jobs()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error cleaning up pipeline jobs: {e}")
     
     async def _cleanup_old_jobs(self, hours_old: int = 24):
         """Cleanup old completed/failed jobs"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours_old)
+        cutoff = time.monotonic() - hours_old * 3600
         
         to_remove = []
         for job_id, job in self.active_jobs.items():
-            if job.completed_at and job.completed_at < cutoff_time:
+            if job.completed_at_mono and job.completed_at_mono < cutoff:
                 to_remove.append(job_id)
         
         for job_id in to_remove:
@@ -654,7 +918,8 @@ class EnhancedPipeline:
     
     async def get_statistics(self) -> Dict[str, Any]:
         """Get pipeline statistics"""
-        active_jobs = len([j for j in self.active_jobs.values() if j.status in ["pending", "processing"]])
+        # Finished jobs are dropped from active_jobs in process_job()
+        active_jobs = len(self.active_jobs)
         
         return {
             "timestamp": datetime.utcnow().isoformat(),
@@ -674,18 +939,36 @@ class EnhancedPipeline:
         
         self.running = False
         
-        # Cancel processing task
-        if self.processing_task:
-            self.processing_task.cancel()
-            try:
-                await self.processing_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel background tasks
+        tasks = [
+            task for task in (*self._workers, self.intake_task, self.cleanup_task, self.state_flush_task)
+            if task
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        await self._video_search.close()
+        await self._image_search.close()
+        
+        # Don't lose stage progress that hasn't been written yet
+        await self._flush_state_updates()
         
         # Wait for active jobs to complete
-        active_jobs = [j for j in self.active_jobs.values() if j.status == "processing"]
-        if active_jobs:
-            logger.info(f"Waiting for {len(active_jobs)} active jobs to complete...")
+        processing = sum(1 for j in self.active_jobs.values() if j.status == "processing")
+        if processing:
+            logger.info(f"Waiting for {processing} active jobs to complete...")
             await asyncio.sleep(5)  # Give them some time
         
+        # Release provider resources, then our reference to the shared factory
+        for provider_name, provider in self.providers.items():
+            if provider and hasattr(provider, 'close'):
+                try:
+                    await provider.close()
+                except Exception as e:
+                    logger.error(f"Error closing {provider_name} provider: {e}")
+        if self._factory_acquired:
+            self._factory_acquired = False
+            await release_provider_factory(self.provider_factory)
+        
         logger.info("Enhanced pipeline shutdown complete")
@@ -5,25 +5,132 @@ Health checking and monitoring
 import asyncio
 import aiohttp
 from aiohttp import web
-from typing import Dict, Optional
+from aiohttp.abc import AbstractAccessLogger
+from typing import Dict, Optional, Any
 import psutil
 import socket
+import time
 from datetime import datetime
 
+# orjson serializes the health payloads several times faster than stdlib json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Readiness probes can arrive in bursts; reuse a result for this long
+READINESS_CACHE_SECONDS = 5.0
+
+def json_response(data, status: int = 200) -> web.Response:
+    """JSON response, serialized with orjson when available"""
+    if HAS_ORJSON:
+        return web.Response(body=orjson.dumps(data), status=status, content_type='application/json')
+    return web.json_response(data, status=status)
+
+class ProbeAccessLogger(AbstractAccessLogger):
+    """Access logger that stays quiet for successful probes and only records failures"""
+    
+    def log(self, request, response, time: float):
+        if response.status < 400:
+            return
+        self.logger.warning(
+            f'{request.remote} "{request.method} {request.path}" {response.status} ({time * 1000:.1f} ms)'
+        )
+
+class Metrics:
+    """Application counters reported by /metrics
+    
+    Updated from the event loop through increment()/record_processing_time().
+    """
+    __slots__ = (
+        'jobs_processed', 'jobs_failed', 'jobs_queued',
+        'videos_created', 'videos_uploaded', 'average_processing_time'
+    )
+    COUNTERS = frozenset(__slots__[:5])
+    
+    def __init__(self):
+        self.jobs_processed = 0
+        self.jobs_failed = 0
+        self.jobs_queued = 0
+        self.videos_created = 0
+        self.videos_uploaded = 0
+        self.average_processing_time = 0.0  # seconds, exponential moving average
+    
+    def increment(self, counter: str, n: int = 1):
+        """Add n to one of the job/video counters"""
+        if counter not in self.COUNTERS:
+            raise ValueError(f"Unknown metric counter: {counter}")
+        setattr(self, counter, getattr(self, counter) + n)
+    
+    def record_processing_time(self, seconds: float, alpha: float = 0.1):
+        """Fold one job's processing time into the moving average"""
+        if self.average_processing_time == 0.0:
+            self.average_processing_time = seconds
+        else:
+            self.average_processing_time += alpha * (seconds - self.average_processing_time)
+    
+    def to_dict(self) -> Dict:
+        return self.update_dict({})
+    
+    def update_dict(self, d: Dict) -> Dict:
+        """Write the counters into an existing dict and return it"""
+        d['jobs_processed'] = self.jobs_processed
+        d['jobs_failed'] = self.jobs_failed
+        d['jobs_queued'] = self.jobs_queued
+        d['videos_created'] = self.videos_created
+        d['videos_uploaded'] = self.videos_uploaded
+        d['avg_processing_time'] = self.average_processing_time
+        return d
+
 class HealthChecker:
     """Health checking and monitoring service"""
     
     def __init__(self, config):
         self.config = config
         self.server = None
+        # Pass as EnhancedPipeline(metrics=...) so finished jobs are counted here
+        self.metrics_data = Metrics()
         self.app = web.Application()
         self.setup_routes()
+        
+        # Latest system samples, refreshed by a background task so handlers never block
+        self._cpu_percent: Optional[float] = None
+        self._memory: Any = None  # psutil.virtual_memory() result, or the error raised
+        self._disk: Any = None    # psutil.disk_usage() result, or the error raised
+        self._sampler_task: Optional[asyncio.Task] = None
+        self._first_snapshot: Optional[asyncio.Task] = None
+        self._readiness: Optional[Dict] = None
+        self._system_info: Optional[Dict] = None  # constant for the process lifetime
+        self._shutdown_event: Optional[asyncio.Event] = None
+        self._readiness_at = 0.0  # time.monotonic() of the cached readiness result
+        self._ts_cache = ('', 0)  # (ISO timestamp, whole second it was formatted for)
+        # Reused by collect_metrics() for every scrape
+        self._metrics_template = {
+            'timestamp': '',
+            'system': {
+                'cpu_percent': 0.0,
+                'memory_percent': 0.0,
+                'memory_available_gb': 0.0,
+                'disk_percent': 0.0,
+                'disk_free_gb': 0.0
+            },
+            'application': self.metrics_data.to_dict()
+        }
+    
+    def _now_iso(self) -> str:
+        """Current time as ISO 8601, formatted at most once per second"""
+        now = int(time.time())
+        if now != self._ts_cache[1]:
+            self._ts_cache = (datetime.fromtimestamp(now).isoformat(), now)
+        return self._ts_cache[0]
     
     def setup_routes(self):
         """Setup health check routes"""
         self.app.router.add_get('/health', self.health_check)
         self.app.router.add_get('/ready', self.ready_check)
         self.app.router.add_get('/metrics', self.metrics)
+        self.app.router.add_get('/metrics_prom', self.metrics_prom)
         self.app.router.add_get('/info', self.system_info)
     
     async def health_check(self, request):
@@ -31,36 +138,103 @@ class HealthChecker:
         health_status = await self.check_system_health()
         
         if health_status['status'] == 'healthy':
-            return web.json_response(health_status)
+            return json_response(health_status)
         else:
-            return web.json_response(health_status, status=503)
+            return json_response(health_status, status=503)
     
     async def ready_check(self, request):
         """Readiness check endpoint"""
         ready_status = await self.check_readiness()
         
         if ready_status['ready']:
-            return web.json_response(ready_status)
+            return json_response(ready_status)
         else:
-            return web.json_response(ready_status, status=503)
+            return json_response(ready_status, status=503)
     
     async def metrics(self, request):
         """Metrics endpoint"""
         metrics = await self.collect_metrics()
-        return web.json_response(metrics)
+        return json_response(metrics)
+    
+    async def metrics_prom(self, request):
+        """Metrics endpoint in Prometheus text exposition format"""
+        metrics = await self.collect_metrics()
+        return web.Response(
+            body=self.format_prometheus(metrics),
+            content_type='text/plain',
+            charset='utf-8',
+            headers={'X-Content-Type-Options': 'nosniff'}
+        )
+    
+    @staticmethod
+    def format_prometheus(metrics: Dict) -> bytes:
+        """Render collect_metrics() output as Prometheus gauges"""
+        lines = []
+        for section in ('system', 'application'):
+            for name, value in metrics[section].items():
+                metric = f"shortsync_{section}_{name}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+        lines.append('')
+        return '\n'.join(lines).encode()
     
     async def system_info(self, request):
         """System information endpoint"""
         info = await self.get_system_info()
-        return web.json_response(info)
+        return json_response(info)
+    
+    async def _ensure_sampler(self):
+        """Start the background sampler, taking a first snapshot if there is none yet"""
+        # Both tasks are assigned before the first await, so concurrent requests share them
+        if self._sampler_task is None or self._sampler_task.done():
+            self._sampler_task = asyncio.create_task(self._sample_system())
+            if self._memory is None:
+                self._first_snapshot = asyncio.create_task(self._refresh_snapshots())
+        if self._first_snapshot is not None:
+            await asyncio.shield(self._first_snapshot)
+    
+    async def _sample_system(self, cpu_interval: float = 1.0, snapshot_every: int = 5):
+        """Sample CPU every second and memory/disk every few seconds"""
+        # The first non-blocking call only sets psutil's baseline
+        psutil.cpu_percent(interval=None)
+        tick = 0
+        
+        while True:
+            await asyncio.sleep(cpu_interval)
+            self._cpu_percent = psutil.cpu_percent(interval=None)
+            
+            tick += 1
+            if tick % snapshot_every == 0:
+                await self._refresh_snapshots()
+    
+    async def _refresh_snapshots(self):
+        """Refresh memory and disk snapshots off the event loop"""
+        self._memory, self._disk = await asyncio.to_thread(self._read_snapshots)
+    
+    def _read_snapshots(self):
+        """Read memory and disk usage, keeping any error in place of the value"""
+        try:
+            memory = psutil.virtual_memory()
+        except Exception as e:
+            memory = e
+        
+        try:
+            disk = psutil.disk_usage(self.config.dirs['data'])
+        except Exception as e:
+            disk = e
+        
+        return memory, disk
     
     async def check_system_health(self) -> Dict:
         """Check overall system health"""
+        await self._ensure_sampler()
         checks = {}
         
         # Disk space check
         try:
-            disk = psutil.disk_usage(self.config.dirs['data'])
+            disk = self._disk
+            if isinstance(disk, Exception):
+                raise disk
             checks['disk_space'] = {
                 'total_gb': disk.total / (1024**3),
                 'used_gb': disk.used / (1024**3),
@@ -73,7 +247,9 @@ class HealthChecker:
         
         # Memory check
         try:
-            memory = psutil.virtual_memory()
+            memory = self._memory
+            if isinstance(memory, Exception):
+                raise memory
             checks['memory'] = {
                 'total_gb': memory.total / (1024**3),
                 'available_gb': memory.available / (1024**3),
@@ -83,9 +259,9 @@ class HealthChecker:
         except Exception as e:
             checks['memory'] = {'healthy': False, 'error': str(e)}
         
-        # CPU check
+        # CPU check (no sample yet until the sampler's first second has passed)
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = self._cpu_percent if self._cpu_percent is not None else 0.0
             checks['cpu'] = {
                 'percent': cpu_percent,
                 'healthy': cpu_percent < 80
@@ -98,71 +274,81 @@ class HealthChecker:
         
         return {
             'status': 'healthy' if all_healthy else 'unhealthy',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._now_iso(),
             'checks': checks
         }
     
     async def check_readiness(self) -> Dict:
         """Check if system is ready to accept traffic"""
+        if self._readiness and time.monotonic() - self._readiness_at < READINESS_CACHE_SECONDS:
+            return self._readiness
+        
         # Add checks for dependencies (database, APIs, etc.)
         ready = True
         reasons = []
         
         # Check if data directory is accessible
         try:
-            test_file = self.config.dirs['data'] / '.test'
-            test_file.touch()
-            test_file.unlink()
+            await asyncio.to_thread(self._probe_data_dir)
         except Exception as e:
             ready = False
             reasons.append(f"Data directory not accessible: {e}")
         
-        # Check network connectivity
+        # Check network connectivity without blocking the event loop
         try:
-            socket.create_connection(("8.8.8.8", 53), timeout=5)
+            _, writer = await asyncio.wait_for(asyncio.open_connection("8.8.8.8", 53), timeout=1.0)
+            writer.close()
+            await writer.wait_closed()
         except Exception as e:
             ready = False
-            reasons.append(f"Network connectivity issue: {e}")
+            reasons.append(f"Network connectivity issue: {e!r}")
         
-        return {
+        self._readiness = {
             'ready': ready,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._now_iso(),
             'reasons': reasons if not ready else []
         }
+        self._readiness_at = time.monotonic()
+        return self._readiness
+    
+    def _probe_data_dir(self):
+        """Create and remove a file in the data directory"""
+        test_file = self.config.dirs['data'] / '.test'
+        test_file.touch()
+        test_file.unlink()
     
     async def collect_metrics(self) -> Dict:
         """Collect system and application metrics"""
-        import time
-        
-        # System metrics
-        cpu_percent = psutil.cpu_percent(interval=None)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage(self.config.dirs['data'])
-        
-        # Application metrics (you would track these in your app)
-        app_metrics = {
-            'jobs_processed': 0,  # Would come from your pipeline
-            'jobs_failed': 0,
-            'jobs_queued': 0,
-            'videos_created': 0,
-            'videos_uploaded': 0,
-            'avg_processing_time': 0
-        }
+        # System metrics, from the background sampler
+        await self._ensure_sampler()
+        cpu_percent = self._cpu_percent if self._cpu_percent is not None else 0.0
+        memory, disk = self._memory, self._disk
+        for sample in (memory, disk):
+            if isinstance(sample, Exception):
+                raise sample
         
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'system': {
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory.percent,
-                'memory_available_gb': memory.available / (1024**3),
-                'disk_percent': disk.percent,
-                'disk_free_gb': disk.free / (1024**3)
-            },
-            'application': app_metrics
-        }
+        # Overwrite the prebuilt payload in place; handlers serialize it before
+        # the next await, so scrapes on the event loop never see a half-written dict
+        metrics = self._metrics_template
+        metrics['timestamp'] = self._now_iso()
+        system = metrics['system']
+        system['cpu_percent'] = cpu_percent
+        system['memory_percent'] = memory.percent
+        system['memory_available_gb'] = memory.available / (1024**3)
+        system['disk_percent'] = disk.percent
+        system['disk_free_gb'] = disk.free / (1024**3)
+        self.metrics_data.update_dict(metrics['application'])
+        return metrics
     
     async def get_system_info(self) -> Dict:
         """Get system information"""
+        if self._system_info is None:
+            # platform.platform()/processor() may read files or spawn uname; do it once
+            self._system_info = await asyncio.to_thread(self._build_system_info)
+        return self._system_info
+    
+    def _build_system_info(self) -> Dict:
+        """Collect the static system information served by /info"""
         import platform
         
         return {
@@ -186,19 +372,29 @@ class HealthChecker:
     
     async def run_health_server(self, host: str = '0.0.0.0', port: int = 8081):
         """Run the health check server"""
-        runner = web.AppRunner(self.app)
+        # Probes hit these endpoints every few seconds; don't write a log line for each
+        runner = web.AppRunner(self.app, access_log_class=ProbeAccessLogger)
         await runner.setup()
         
         site = web.TCPSite(runner, host, port)
         await site.start()
         
         self.server = runner
+        await self._ensure_sampler()
         
-        # Keep running
-        while True:
-            await asyncio.sleep(3600)  # Sleep for an hour
+        # Keep running until stop() (or cancellation)
+        self._shutdown_event = asyncio.Event()
+        await self._shutdown_event.wait()
     
     async def stop(self):
         """Stop the health check server"""
+        if self._shutdown_event:
+            self._shutdown_event.set()
+        
+        if self._sampler_task:
+            self._sampler_task.cancel()
+            self._sampler_task = None
+        self._first_snapshot = None
+        
         if self.server:
             await self.server.cleanup()
@@ -6,6 +6,11 @@ rate limiting, and job tracking.
 """
 
 import asyncio
+import inspect
+import os
+from array import array
+from collections import OrderedDict, defaultdict, deque
+import time
 import uuid
 import heapq
 from pathlib import Path
@@ -18,6 +23,52 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# orjson encodes the queue snapshot and log records several times faster than json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Mutations are appended to a write-ahead log; the full snapshot is rewritten
+# (and the log truncated) only after this many entries or seconds
+WAL_COMPACT_ENTRIES = 1000
+WAL_COMPACT_INTERVAL = 60.0  # seconds
+
+# The queue processor sleeps on an event when idle, waking at least this often
+IDLE_WAKEUP_INTERVAL = 5.0  # seconds
+HOUSEKEEPING_INTERVAL = 1.0  # seconds between results cleanup/stats writes
+
+# Job rows are written in batches; a write waits at most this long for others to join it
+DB_FLUSH_DELAY = 0.05  # seconds
+
+# Results kept in memory for get_job_status(); older ones are looked up in the database
+MAX_JOB_RESULTS = 10000
+
+def _dumps(obj) -> bytes:
+    """Compact JSON encoding, via orjson when available"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+def _loads(data):
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _ns_to_iso(ns: int) -> str:
+    """Epoch nanoseconds as a naive UTC ISO string, matching datetime.utcnow().isoformat()"""
+    return (_EPOCH + timedelta(microseconds=ns // 1000)).isoformat()
+
+def _iso_to_ns(iso: str) -> int:
+    return (datetime.fromisoformat(iso) - _EPOCH) // timedelta(microseconds=1) * 1000
+
+def _write_atomic(path: Path, data: bytes):
+    """Replace path with data so a crash mid-write can't leave a torn file"""
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
 class JobPriority(Enum):
     """Job priority levels"""
     LOW = 0
@@ -33,13 +84,23 @@ class JobStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
-@dataclass(order=True)
+@dataclass(slots=True, eq=False)
 class PrioritizedJob:
     """Job with priority for heap queue"""
     priority: int
-    timestamp: datetime
-    job_id: str = field(compare=False)
-    job_data: Dict[str, Any] = field(compare=False)
+    created_ns: int  # time.time_ns() at creation; formatted as ISO only when persisted
+    job_id: str
+    job_data: Dict[str, Any]
+    # Cancelled jobs stay in the heap as tombstones and are skipped when popped
+    cancelled: bool = False
+    # Heap order: highest priority first, then oldest; precomputed so sifts compare plain tuples
+    sort_key: Tuple[int, int] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.sort_key = (-self.priority, self.created_ns)
+    
+    def __lt__(self, other: 'PrioritizedJob') -> bool:
+        return self.sort_key < other.sort_key
 
 @dataclass
 class JobResult:
@@ -51,6 +112,7 @@ class JobResult:
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     execution_time: Optional[float] = None  # seconds
+    job_type: Optional['JobType'] = None
 
 class JobType(Enum):
     """Types of jobs that can be processed"""
@@ -64,17 +126,31 @@ class JobType(Enum):
     YOUTUBE_UPLOAD = "youtube_upload"
     PIPELINE_EXECUTION = "pipeline_execution"
 
+# Value -> member maps; plain dict lookups are much cheaper than Enum.__call__ on hot paths
+_JOBTYPE_BY_VALUE: Dict[str, JobType] = {t.value: t for t in JobType}
+_JOBSTATUS_BY_VALUE: Dict[str, JobStatus] = {s.value: s for s in JobStatus}
+# Slot of each job type in the per-counter arrays
+_JOBTYPE_INDEX: Dict[JobType, int] = {t: i for i, t in enumerate(JobType)}
+
 class JobQueue:
     """Main job queue management class"""
     
-    def __init__(self, config, db_manager):
+    def __init__(self, config, db_manager, max_results: int = MAX_JOB_RESULTS):
         self.config = config
         self.db = db_manager
+        self.max_results = max_results
         
-        # Queue storage
-        self.priority_queue: List[PrioritizedJob] = []
+        # Queue storage: one heap per job type, so producers and consumers of
+        # different types don't contend on a single lock
+        self._shards: Dict[JobType, List[PrioritizedJob]] = {job_type: [] for job_type in JobType}
+        self._shard_locks: Dict[JobType, asyncio.Lock] = {job_type: asyncio.Lock() for job_type in JobType}
+        self._tombstones: Dict[JobType, int] = {job_type: 0 for job_type in JobType}
+        self._job_index: Dict[str, PrioritizedJob] = {}  # pending (non-cancelled) jobs by id
         self.active_jobs: Dict[str, asyncio.Task] = {}
-        self.job_results: Dict[str, JobResult] = {}
+        self._concurrent_by_type: Dict[JobType, int] = defaultdict(int)  # unfinished active_jobs per type
+        self._active_job_types: Dict[str, JobType] = {}
+        # Most recently stored last; oldest evicted beyond max_results (the database keeps the rest)
+        self.job_results: OrderedDict[str, JobResult] = OrderedDict()
         self.job_callbacks: Dict[str, List[callable]] = {}
         
         # Rate limiting
@@ -91,21 +167,57 @@ class JobQueue:
         }
         
         # Statistics
-        self.job_counters: Dict[JobType, Dict[str, int]] = {}
-        self.hourly_counters: Dict[JobType, List[datetime]] = {}
+        # One array per counter, indexed by _JOBTYPE_INDEX; see the job_counters property
+        self._c_total = array('Q', [0]) * len(JobType)
+        self._c_completed = array('Q', [0]) * len(JobType)
+        self._c_failed = array('Q', [0]) * len(JobType)
+        self._c_cancelled = array('Q', [0]) * len(JobType)
+        self._counter_arrays: Dict[str, array] = {
+            "total": self._c_total,
+            "completed": self._c_completed,
+            "failed": self._c_failed,
+            "cancelled": self._c_cancelled
+        }
+        # Jobs started per minute over the last hour, as a ring of 60 minute buckets
+        self.hourly_counters: Dict[JobType, array] = {job_type: array('I', [0]) * 60 for job_type in JobType}
+        self._hourly_minute: Dict[JobType, int] = dict.fromkeys(JobType, int(time.monotonic() // 60))
         
         # Control flags
         self.running = False
         self.processing_task: Optional[asyncio.Task] = None
+        self._has_work = asyncio.Event()  # set when a job is added or a concurrency slot frees
+        # Same signal for get_job() callers; replaced on each firing so several waiters can share it
+        self._work_signal = asyncio.Event()
+        self._db_ops: deque = deque()  # pending job row writes, see _queue_db_op()
+        self._db_pending = asyncio.Event()
+        self._db_flush_task: Optional[asyncio.Task] = None
+        # Finished job tasks, recorded in completion order by one drainer task
+        self._completions: asyncio.Queue = asyncio.Queue()
+        self._completion_task: Optional[asyncio.Task] = None
+        self._callback_tasks: set = set()  # running job callbacks; shutdown doesn't wait on them
+        self._last_housekeeping = 0.0
         
         # State files
         self.queue_file = config.dirs['queue'] / 'job_queue.json'
         self.stats_file = config.dirs['queue'] / 'queue_stats.json'
+        self.wal_file = config.dirs['queue'] / 'job_queue.wal'
+        self._wal_fp = None
+        self._wal_seq = 0  # sequence number of the last logged mutation
+        self._wal_entries = 0  # entries logged since the last snapshot
+        self._last_snapshot = time.monotonic()
         
         # Locks
         self.queue_lock = asyncio.Lock()
         self.stats_lock = asyncio.Lock()
         
+    @property
+    def job_counters(self) -> Dict[JobType, Dict[str, int]]:
+        """Per-type counters as nested dicts (a snapshot, not a live view)"""
+        return {
+            job_type: {key: counts[i] for key, counts in self._counter_arrays.items()}
+            for job_type, i in _JOBTYPE_INDEX.items()
+        }
+    
     async def initialize(self):
         """Initialize job queue"""
         logger.info("Initializing job queue...")
@@ -113,21 +225,13 @@ class JobQueue:
         # Ensure queue directory exists
         self.config.dirs['queue'].mkdir(parents=True, exist_ok=True)
         
-        # Initialize counters
-        for job_type in JobType:
-            self.job_counters[job_type] = {
-                "total": 0,
-                "completed": 0,
-                "failed": 0,
-                "cancelled": 0
-            }
-            self.hourly_counters[job_type] = []
-        
         # Load saved queue state
         await self.load_queue_state()
         
         # Start queue processor
         self.running = True
+        self._db_flush_task = asyncio.create_task(self._run_db_flusher())
+        self._completion_task = asyncio.create_task(self._drain_completions())
         self.processing_task = asyncio.create_task(self._process_queue())
         
         logger.info("Job queue initialized")
@@ -138,6 +242,7 @@ class JobQueue:
                         metadata: Dict[str, Any] = None) -> str:
         """Create a new job and add to queue"""
         job_id = str(uuid.uuid4())
+        now_ns = time.time_ns()
         
         # Prepare job data
         full_job_data = {
@@ -146,156 +251,184 @@ class JobQueue:
             "priority": priority.value,
             "data": job_data,
             "metadata": metadata or {},
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": _ns_to_iso(now_ns),
             "status": JobStatus.PENDING.value
         }
         
         # Create prioritized job
         prioritized_job = PrioritizedJob(
             priority=priority.value,
-            timestamp=datetime.utcnow(),
+            created_ns=now_ns,
             job_id=job_id,
             job_data=full_job_data
         )
         
         # Add to queue
-        async with self.queue_lock:
-            heapq.heappush(self.priority_queue, prioritized_job)
+        async with self._shard_locks[job_type]:
+            heapq.heappush(self._shards[job_type], prioritized_job)
+            self._job_index[job_id] = prioritized_job
+            self._signal_work()
             
             # Update counters
-            self.job_counters[job_type]["total"] += 1
+            self._c_total[_JOBTYPE_INDEX[job_type]] += 1
+            self._wal_append({"op": "add", "job": self._job_entry(prioritized_job)})
             
             # Save to database
-            await self.db.save_job({
+            self._queue_db_op('save', {
                 "id": job_id,
                 "type": job_type.value,
                 "status": "pending",
-                "data": json.dumps(full_job_data)
+                "channel": job_data.get("channel"),
+                "topic": job_data.get("topic")
             })
         
-        # Save queue state
-        await self.save_queue_state()
-        
         logger.info(f"Created job {job_id} of type {job_type.value} with priority {priority.value}")
         return job_id
     
     async def get_job(self, timeout: float = 30.0) -> Optional[Dict[str, Any]]:
-        """Get next job from queue with timeout"""
+        """Get next job from queue, waiting up to timeout for one to become eligible"""
         try:
             async with asyncio.timeout(timeout):
-                async with self.queue_lock:
-                    if not self.priority_queue:
-                        return None
-                    
-                    # Get highest priority job
-                    prioritized_job = heapq.heappop(self.priority_queue)
-                    job_data = prioritized_job.job_data
-                    
-                    # Check rate limits
-                    job_type = JobType(job_data["job_type"])
-                    if not await self._check_rate_limits(job_type):
-                        # Put back in queue with delay
-                        heapq.heappush(self.priority_queue, prioritized_job)
-                        return None
-                    
-                    # Update status
-                    job_data["status"] = JobStatus.PROCESSING.value
-                    job_data["started_at"] = datetime.utcnow().isoformat()
-                    
-                    # Update hourly counter
-                    self.hourly_counters[job_type].append(datetime.utcnow())
-                    
-                    # Update database
-                    await self.db.update_job_status(
-                        job_data["job_id"],
-                        "processing",
-                        {"started_at": job_data["started_at"]}
-                    )
-                    
-                    # Save queue state
-                    await self.save_queue_state()
-                    
-                    logger.debug(f"Retrieved job {job_data['job_id']} for processing")
-                    return job_data
-                    
+                while True:
+                    # Take the signal before looking, so a job added meanwhile still wakes us
+                    signal = self._work_signal
+                    job_data = await self._take_job()
+                    if job_data is not None:
+                        return job_data
+                    await signal.wait()
         except asyncio.TimeoutError:
             return None
         except Exception as e:
             logger.error(f"Error getting job from queue: {e}")
             return None
     
-    async def submit_job_result(self, job_id: str, result: JobResult):
+    async def _take_job(self) -> Optional[Dict[str, Any]]:
+        """Move the next eligible job to processing, or return None if there is none"""
+        # Take from the shard with the best head among types under their rate limits
+        job_type = await self._select_shard()
+        if job_type is None:
+            return None
+        
+        async with self._shard_locks[job_type]:
+            prioritized_job = self._pop_pending(job_type)
+            if prioritized_job is None:
+                return None
+            job_data = prioritized_job.job_data
+            
+            del self._job_index[prioritized_job.job_id]
+            
+            # Update status
+            job_data["status"] = JobStatus.PROCESSING.value
+            job_data["started_at"] = datetime.utcnow().isoformat()
+            
+            # Update hourly counter
+            ring = self._hourly_ring(job_type)
+            ring[self._hourly_minute[job_type] % 60] += 1
+            
+            # Update database
+            self._queue_db_op('status', job_data["job_id"], "processing", {"started_at": job_data["started_at"]}, None)
+            
+            self._wal_append({"op": "pop", "job_id": job_data["job_id"]})
+            
+            logger.debug(f"Retrieved job {job_data['job_id']} for processing")
+            return job_data
+    
+    async def submit_job_result(self, job_id: str, result: JobResult, job_type: Optional[JobType] = None):
         """Submit result for a completed job"""
+        await self._record_job_result(job_id, result, job_type)
+        
+        # Execute callbacks concurrently, so a slow one doesn't hold up the rest
+        callbacks = self.job_callbacks.pop(job_id, None)
+        if callbacks:
+            await asyncio.gather(*(self._run_callback(callback, result) for callback in callbacks))
+    
+    async def _record_job_result(self, job_id: str, result: JobResult, job_type: Optional[JobType] = None):
+        """Record a finished job's result, counters and database row, without running callbacks"""
         async with self.queue_lock:
+            # Update counters
+            if job_type is None:
+                job_type = result.job_type or await self._get_job_type_for_id(job_id)
+            
             # Update job result
-            self.job_results[job_id] = result
+            result.job_type = job_type
+            self._store_result(job_id, result)
             
-            # Update counters
-            job_type = await self._get_job_type_for_id(job_id)
             if job_type:
                 counter_key = result.status.value.lower()
-                if counter_key in self.job_counters[job_type]:
-                    self.job_counters[job_type][counter_key] += 1
+                counts = self._counter_arrays.get(counter_key)
+                if counts is not None:
+                    counts[_JOBTYPE_INDEX[job_type]] += 1
+                    self._wal_append({"op": "count", "job_type": job_type.value, "key": counter_key})
             
             # Remove from active jobs if present
             if job_id in self.active_jobs:
                 del self.active_jobs[job_id]
+            self._active_job_types.pop(job_id, None)
             
             # Update database
             db_result = None
             if result.result:
                 db_result = {"result": result.result}
             
-            await self.db.update_job_status(
-                job_id,
-                result.status.value,
-                db_result,
-                result.error
-            )
-        
-        # Execute callbacks
-        if job_id in self.job_callbacks:
-            for callback in self.job_callbacks[job_id]:
-                try:
-                    await callback(result)
-                except Exception as e:
-                    logger.error(f"Error in job callback: {e}")
-            del self.job_callbacks[job_id]
-        
-        # Save queue state
-        await self.save_queue_state()
+            self._queue_db_op('status', job_id, result.status.value, db_result, result.error)
         
         logger.info(f"Job {job_id} completed with status {result.status.value}")
     
+    def _dispatch_callbacks(self, job_id: str, result: JobResult):
+        """Run a job's callbacks in their own tasks, so they never hold up recording other jobs"""
+        for callback in self.job_callbacks.pop(job_id, None) or ():
+            task = asyncio.create_task(self._run_callback(callback, result))
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._callback_tasks.discard)
+    
+    async def _run_callback(self, callback: callable, result: JobResult):
+        """Run one job callback, sync or async, logging rather than raising its errors"""
+        try:
+            outcome = callback(result)
+            if inspect.isawaitable(outcome):
+                await outcome
+        except Exception as e:
+            logger.error(f"Error in job callback: {e}")
+    
     async def cancel_job(self, job_id: str) -> bool:
         """Cancel a pending or processing job"""
-        async with self.queue_lock:
-            # Check if job is in queue
-            for i, prioritized_job in enumerate(self.priority_queue):
-                if prioritized_job.job_id == job_id:
-                    # Remove from queue
-                    self.priority_queue.pop(i)
-                    heapq.heapify(self.priority_queue)
+        # Check if job is in queue; it's tombstoned in place rather than removed from the heap
+        prioritized_job = self._job_index.get(job_id)
+        if prioritized_job:
+            job_type = _JOBTYPE_BY_VALUE[prioritized_job.job_data["job_type"]]
+            async with self._shard_locks[job_type]:
+                # Re-check: it may have been picked up while we waited for the lock
+                if self._job_index.pop(job_id, None):
+                    prioritized_job.cancelled = True
+                    self._tombstones[job_type] += 1
                     
                     # Update result
                     result = JobResult(
                         job_id=job_id,
                         status=JobStatus.CANCELLED,
-                        completed_at=datetime.utcnow()
+                        completed_at=datetime.utcnow(),
+                        job_type=job_type
                     )
-                    self.job_results[job_id] = result
+                    self._store_result(job_id, result)
                     
                     # Update counters
-                    job_type = await self._get_job_type_for_id(job_id)
-                    if job_type:
-                        self.job_counters[job_type]["cancelled"] += 1
+                    self._c_cancelled[_JOBTYPE_INDEX[job_type]] += 1
+                    self._wal_append({"op": "cancel", "job_id": job_id})
                     
                     # Update database
-                    await self.db.update_job_status(job_id, "cancelled")
+                    self._queue_db_op('status', job_id, "cancelled", None, None)
+                    
+                    # Don't let tombstones pile up if nothing is consuming this shard
+                    shard = self._shards[job_type]
+                    if self._tombstones[job_type] > len(shard) // 2 + 64:
+                        shard[:] = [job for job in shard if not job.cancelled]
+                        heapq.heapify(shard)
+                        self._tombstones[job_type] = 0
                     
                     logger.info(f"Cancelled pending job {job_id}")
                     return True
-            
+        
+        async with self.queue_lock:
             # Check if job is active
             if job_id in self.active_jobs:
                 task = self.active_jobs[job_id]
@@ -307,22 +440,25 @@ class JobQueue:
                         pass
                 
                 # Update result
+                job_type = await self._get_job_type_for_id(job_id)
                 result = JobResult(
                     job_id=job_id,
                     status=JobStatus.CANCELLED,
-                    completed_at=datetime.utcnow()
+                    completed_at=datetime.utcnow(),
+                    job_type=job_type
                 )
-                self.job_results[job_id] = result
+                self._store_result(job_id, result)
                 
                 # Update counters
-                job_type = await self._get_job_type_for_id(job_id)
                 if job_type:
-                    self.job_counters[job_type]["cancelled"] += 1
+                    self._c_cancelled[_JOBTYPE_INDEX[job_type]] += 1
+                    self._wal_append({"op": "count", "job_type": job_type.value, "key": "cancelled"})
                 
                 # Update database
-                await self.db.update_job_status(job_id, "cancelled")
+                self._queue_db_op('status', job_id, "cancelled", None, None)
                 
                 del self.active_jobs[job_id]
+                self._active_job_types.pop(job_id, None)
                 logger.info(f"Cancelled active job {job_id}")
                 return True
         
@@ -357,19 +493,17 @@ class JobQueue:
                 )
         
         # Check if job is in queue
-        async with self.queue_lock:
-            for prioritized_job in self.priority_queue:
-                if prioritized_job.job_id == job_id:
-                    return JobResult(
-                        job_id=job_id,
-                        status=JobStatus.PENDING
-                    )
+        if job_id in self._job_index:
+            return JobResult(
+                job_id=job_id,
+                status=JobStatus.PENDING
+            )
         
         # Try to get from database
         try:
             job_data = await self.db.get_job(job_id)
             if job_data:
-                status = JobStatus(job_data.get("status", "pending"))
+                status = _JOBSTATUS_BY_VALUE[job_data.get("status", "pending")]
                 return JobResult(
                     job_id=job_id,
                     status=status,
@@ -383,8 +517,7 @@ class JobQueue:
     
     async def get_queue_size(self) -> int:
         """Get current queue size"""
-        async with self.queue_lock:
-            return len(self.priority_queue)
+        return len(self._job_index)
     
     async def get_active_job_count(self) -> int:
         """Get number of active jobs"""
@@ -402,8 +535,9 @@ class JobQueue:
         
         while self.running:
             try:
-                # Get next job
-                job_data = await self.get_job(timeout=1.0)
+                # Clear before looking so a job added from here on still wakes us
+                self._has_work.clear()
+                job_data = await self._take_job()
                 
                 if job_data:
                     # Create processing task
@@ -415,22 +549,40 @@ class JobQueue:
                     
                     # Store task
                     self.active_jobs[job_id] = task
+                    job_type = _JOBTYPE_BY_VALUE[job_data["job_type"]]
+                    self._active_job_types[job_id] = job_type
+                    self._concurrent_by_type[job_type] += 1
                     
                     # Add done callback
                     task.add_done_callback(
-                        lambda t, jid=job_id: asyncio.create_task(
-                            self._handle_job_completion(t, jid)
-                        )
+                        lambda t, jid=job_id, jt=job_type: self._on_job_done(t, jid, jt)
                     )
                 
-                # Cleanup old results
-                await self._cleanup_old_results()
-                
-                # Update statistics
-                await self._update_statistics()
+                if time.monotonic() - self._last_housekeeping >= HOUSEKEEPING_INTERVAL:
+                    self._last_housekeeping = time.monotonic()
+                    
+                    # Cleanup old results
+                    await self._cleanup_old_results()
+                    
+                    # Update statistics
+                    await self._update_statistics()
+                    
+                    # Fold the write-ahead log into a fresh snapshot now and then
+                    if self._wal_entries and (
+                        self._wal_entries >= WAL_COMPACT_ENTRIES
+                        or time.monotonic() - self._last_snapshot >= WAL_COMPACT_INTERVAL
+                    ):
+                        await self.save_queue_state()
                 
-                # Small sleep to prevent busy looping
-                await asyncio.sleep(0.1)
+                if not job_data:
+                    # Nothing eligible (empty, or every pending type is at a limit): sleep until
+                    # a job is added or a slot frees up; hourly limits and housekeeping need a
+                    # periodic wakeup as well
+                    try:
+                        async with asyncio.timeout(IDLE_WAKEUP_INTERVAL):
+                            await self._has_work.wait()
+                    except asyncio.TimeoutError:
+                        pass
                 
             except asyncio.CancelledError:
                 break
@@ -445,7 +597,7 @@ class JobQueue:
         # This method should be overridden by the pipeline
         # that uses the job queue
         job_id = job_data["job_id"]
-        job_type = JobType(job_data["job_type"])
+        job_type = _JOBTYPE_BY_VALUE[job_data["job_type"]]
         
         logger.warning(f"Job execution not implemented for {job_type.value}, returning mock result")
         
@@ -460,11 +612,33 @@ class JobQueue:
             completed_at=datetime.utcnow()
         )
     
-    async def _handle_job_completion(self, task: asyncio.Task, job_id: str):
+    def _signal_work(self):
+        """Wake the queue processor and any get_job() waiters"""
+        self._has_work.set()
+        self._work_signal.set()
+        self._work_signal = asyncio.Event()
+    
+    def _on_job_done(self, task: asyncio.Task, job_id: str, job_type: JobType):
+        """Free the job's concurrency slot as soon as it finishes, then queue it for recording"""
+        self._concurrent_by_type[job_type] -= 1
+        self._signal_work()
+        self._completions.put_nowait((task, job_id, job_type))
+    
+    async def _drain_completions(self):
+        """Record finished jobs one at a time, without a new task per completion"""
+        while True:
+            task, job_id, job_type = await self._completions.get()
+            try:
+                await self._handle_job_completion(task, job_id, job_type)
+            except Exception as e:
+                logger.error(f"Error recording completion of job {job_id}: {e}")
+            finally:
+                self._completions.task_done()
+    
+    async def _handle_job_completion(self, task: asyncio.Task, job_id: str, job_type: Optional[JobType] = None):
         """Handle job completion"""
         try:
             result = task.result()
-            await self.submit_job_result(job_id, result)
         except asyncio.CancelledError:
             # Job was cancelled
             result = JobResult(
@@ -472,7 +646,6 @@ class JobQueue:
                 status=JobStatus.CANCELLED,
                 completed_at=datetime.utcnow()
             )
-            await self.submit_job_result(job_id, result)
         except Exception as e:
             # Job failed
             result = JobResult(
@@ -481,53 +654,141 @@ class JobQueue:
                 error=str(e),
                 completed_at=datetime.utcnow()
             )
-            await self.submit_job_result(job_id, result)
+        await self._record_job_result(job_id, result, job_type)
+        self._dispatch_callbacks(job_id, result)
+    
+    def _queue_db_op(self, *op):
+        """Queue a job row write: ('save', job_data) or ('status', job_id, status, result, error)"""
+        self._db_ops.append(op)
+        self._db_pending.set()
+    
+    async def _run_db_flusher(self):
+        """Write queued job rows in batches, so callers never wait on the database"""
+        while True:
+            await self._db_pending.wait()
+            # Give writes made in the same burst a moment to join the batch
+            await asyncio.sleep(DB_FLUSH_DELAY)
+            self._db_pending.clear()
+            await self._flush_db_ops()
+    
+    async def _flush_db_ops(self):
+        """Apply all queued job row writes, in order"""
+        if not self._db_ops:
+            return
+        ops = list(self._db_ops)
+        self._db_ops.clear()
+        
+        try:
+            await self._apply_db_ops(ops)
+        except Exception as e:
+            if len(ops) == 1:
+                logger.error(f"Error writing {ops[0][0]} of job {self._db_op_job_id(ops[0])} to database: {e}")
+                return
+            logger.warning(f"Error writing {len(ops)} job updates to database, retrying one at a time: {e}")
+            # Only the write that actually fails is dropped
+            for op in ops:
+                try:
+                    await self._apply_db_ops([op])
+                except Exception as e:
+                    logger.error(f"Error writing {op[0]} of job {self._db_op_job_id(op)} to database, dropping it: {e}")
+    
+    @staticmethod
+    def _db_op_job_id(op: tuple) -> str:
+        """Job id of a queued write; see _queue_db_op() for the op shapes"""
+        return op[1]["id"] if op[0] == 'save' else op[1]
+    
+    async def _apply_db_ops(self, ops: List[tuple]):
+        """Write job rows in one transaction when the database supports it"""
+        if hasattr(self.db, 'apply_job_ops'):
+            await self.db.apply_job_ops(ops)
+        else:
+            for op, *args in ops:
+                if op == 'save':
+                    await self.db.save_job(*args)
+                else:
+                    await self.db.update_job_status(*args)
+    
+    def _store_result(self, job_id: str, result: JobResult):
+        """Remember a job's result, evicting the least recently stored beyond max_results"""
+        self.job_results[job_id] = result
+        self.job_results.move_to_end(job_id)
+        while len(self.job_results) > self.max_results:
+            self.job_results.popitem(last=False)
+    
+    def _pop_pending(self, job_type: JobType) -> Optional[PrioritizedJob]:
+        """Pop the first job of a shard that hasn't been cancelled"""
+        shard = self._shards[job_type]
+        while shard:
+            prioritized_job = heapq.heappop(shard)
+            if not prioritized_job.cancelled:
+                return prioritized_job
+            self._tombstones[job_type] -= 1
+        return None
+    
+    async def _select_shard(self) -> Optional[JobType]:
+        """Job type whose next job comes first in queue order, skipping rate-limited types"""
+        best_type, best_head = None, None
+        for job_type, shard in self._shards.items():
+            # Drop tombstones at the head so we compare live jobs
+            while shard and shard[0].cancelled:
+                heapq.heappop(shard)
+                self._tombstones[job_type] -= 1
+            if not shard or (best_head is not None and not shard[0] < best_head):
+                continue
+            if await self._check_rate_limits(job_type):
+                best_type, best_head = job_type, shard[0]
+        return best_type
     
     async def _check_rate_limits(self, job_type: JobType) -> bool:
         """Check if job type is within rate limits"""
         limits = self.job_type_limits.get(job_type, {})
         
         # Check concurrent limit
-        concurrent_count = sum(
-            1 for job in self.active_jobs.values()
-            if not job.done()
-        )
-        
-        if concurrent_count >= limits.get("max_concurrent", 5):
+        if self._concurrent_by_type[job_type] >= limits.get("max_concurrent", 5):
             logger.debug(f"Concurrent limit reached for {job_type.value}")
             return False
         
         # Check hourly limit
-        hour_ago = datetime.utcnow() - timedelta(hours=1)
-        hourly_count = sum(
-            1 for timestamp in self.hourly_counters[job_type]
-            if timestamp > hour_ago
-        )
-        
-        if hourly_count >= limits.get("per_hour", 100):
+        if sum(self._hourly_ring(job_type)) >= limits.get("per_hour", 100):
             logger.debug(f"Hourly limit reached for {job_type.value}")
             return False
         
         return True
     
+    def _hourly_ring(self, job_type: JobType) -> array:
+        """Minute buckets for job_type, with buckets older than an hour zeroed"""
+        ring = self.hourly_counters[job_type]
+        minute = int(time.monotonic() // 60)
+        last = self._hourly_minute[job_type]
+        if minute != last:
+            if minute - last >= 60:
+                ring[:] = array('I', [0]) * 60
+            else:
+                for m in range(last + 1, minute + 1):
+                    ring[m % 60] = 0
+            self._hourly_minute[job_type] = minute
+        return ring
+    
     async def _get_job_type_for_id(self, job_id: str) -> Optional[JobType]:
         """Get job type for a job ID"""
         # Check in queue
-        async with self.queue_lock:
-            for prioritized_job in self.priority_queue:
-                if prioritized_job.job_id == job_id:
-                    return JobType(prioritized_job.job_data["job_type"])
+        prioritized_job = self._job_index.get(job_id)
+        if prioritized_job:
+            return _JOBTYPE_BY_VALUE[prioritized_job.job_data["job_type"]]
         
-        # Check in results
-        if job_id in self.job_results:
-            # Need to track job type in results or query database
-            pass
+        # Check running jobs, then results
+        job_type = self._active_job_types.get(job_id)
+        if job_type:
+            return job_type
+        result = self.job_results.get(job_id)
+        if result and result.job_type:
+            return result.job_type
         
         # Query database
         try:
             job_data = await self.db.get_job(job_id)
             if job_data and job_data.get("type"):
-                return JobType(job_data["type"])
+                return _JOBTYPE_BY_VALUE.get(job_data["type"])
         except Exception as e:
             logger.error(f"Error getting job type from database: {e}")
         
@@ -546,13 +807,6 @@ class JobQueue:
             
             for job_id in to_remove:
                 del self.job_results[job_id]
-            
-            # Cleanup hourly counters
-            for job_type in self.hourly_counters:
-                self.hourly_counters[job_type] = [
-                    ts for ts in self.hourly_counters[job_type]
-                    if ts > cutoff_time
-                ]
     
     async def _update_statistics(self):
         """Update and save queue statistics"""
@@ -567,38 +821,90 @@ class JobQueue:
                 }
             }
             
-            # Save to file
+            # Save to file without blocking the event loop
             try:
-                with open(self.stats_file, 'w') as f:
-                    json.dump(stats, f, indent=2)
+                await asyncio.to_thread(_write_atomic, self.stats_file, _dumps(stats))
             except Exception as e:
                 logger.error(f"Error saving queue statistics: {e}")
     
+    @staticmethod
+    def _job_entry(prioritized_job: PrioritizedJob) -> Dict[str, Any]:
+        """Serializable form of a queued job, used by the snapshot and the WAL"""
+        return {
+            "priority": prioritized_job.priority,
+            "timestamp": _ns_to_iso(prioritized_job.created_ns),
+            "job_id": prioritized_job.job_id,
+            "job_data": prioritized_job.job_data
+        }
+    
+    @staticmethod
+    def _job_from_entry(item: Dict[str, Any]) -> PrioritizedJob:
+        return PrioritizedJob(
+            priority=item["priority"],
+            created_ns=_iso_to_ns(item["timestamp"]),
+            job_id=item["job_id"],
+            job_data=item["job_data"]
+        )
+    
+    def _open_wal(self):
+        """Unbuffered append handle on the write-ahead log, opened on first use"""
+        if self._wal_fp is None:
+            self._wal_fp = open(self.wal_file, 'ab', buffering=0)
+        return self._wal_fp
+    
+    def _wal_append(self, record: Dict[str, Any]):
+        """Log one queue mutation (synchronous, so records never interleave)"""
+        try:
+            self._open_wal()
+            self._wal_seq += 1
+            record["seq"] = self._wal_seq
+            self._wal_fp.write(_dumps(record) + b'\n')
+            self._wal_entries += 1
+        except Exception as e:
+            logger.error(f"Error writing queue log: {e}")
+    
+    def _write_snapshot(self, jobs: List[PrioritizedJob], tail: bytes):
+        """Stream the snapshot to disk one job at a time, then swap it in
+        
+        tail is the encoded object holding the remaining top-level keys.
+        """
+        tmp_file = self.queue_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(b'{"queue":[')
+            for i, job in enumerate(jobs):
+                if i:
+                    f.write(b',')
+                f.write(_dumps(self._job_entry(job)))
+            f.write(b'],')
+            f.write(tail[1:])
+        os.replace(tmp_file, self.queue_file)
+    
     async def save_queue_state(self):
-        """Save queue state to disk"""
+        """Save a full queue snapshot to disk and truncate the write-ahead log"""
+        # queue_lock only serializes snapshots; producers and consumers keep running
         async with self.queue_lock:
             try:
-                # Prepare queue data
-                queue_data = []
-                for prioritized_job in self.priority_queue:
-                    queue_data.append({
-                        "priority": prioritized_job.priority,
-                        "timestamp": prioritized_job.timestamp.isoformat(),
-                        "job_id": prioritized_job.job_id,
-                        "job_data": prioritized_job.job_data
-                    })
-                
-                state = {
-                    "queue": queue_data,
+                snapshot_seq = self._wal_seq
+                jobs = list(self._job_index.values())
+                tail = _dumps({
                     "job_counters": {
                         job_type.value: counters
                         for job_type, counters in self.job_counters.items()
                     },
+                    "wal_seq": snapshot_seq,
                     "saved_at": datetime.utcnow().isoformat()
-                }
+                })
+                
+                # Jobs changed while the thread encodes them are also in the log
+                # past snapshot_seq, so replay corrects any that are out of date
+                await asyncio.to_thread(self._write_snapshot, jobs, tail)
+                self._last_snapshot = time.monotonic()
                 
-                with open(self.queue_file, 'w') as f:
-                    json.dump(state, f, indent=2)
+                # Truncate only if nothing was logged during the write; otherwise the
+                # log is kept and replay skips the entries the snapshot already covers
+                if self._wal_seq == snapshot_seq:
+                    self._open_wal().truncate(0)
+                    self._wal_entries = 0
                 
                 logger.debug("Queue state saved to disk")
                 
@@ -606,37 +912,99 @@ class JobQueue:
                 logger.error(f"Error saving queue state: {e}")
     
     async def load_queue_state(self):
-        """Load queue state from disk"""
+        """Load the queue snapshot from disk, then replay the write-ahead log"""
         try:
+            snapshot_seq = 0
+            self._job_index = {}
             if self.queue_file.exists():
-                with open(self.queue_file, 'r') as f:
-                    state = json.load(f)
+                state = _loads(self.queue_file.read_bytes())
                 
                 # Load queue
-                self.priority_queue = []
                 for item in state.get("queue", []):
-                    prioritized_job = PrioritizedJob(
-                        priority=item["priority"],
-                        timestamp=datetime.fromisoformat(item["timestamp"]),
-                        job_id=item["job_id"],
-                        job_data=item["job_data"]
-                    )
-                    heapq.heappush(self.priority_queue, prioritized_job)
+                    prioritized_job = self._job_from_entry(item)
+                    self._job_index[prioritized_job.job_id] = prioritized_job
                 
                 # Load counters
                 for job_type_str, counters in state.get("job_counters", {}).items():
-                    try:
-                        job_type = JobType(job_type_str)
-                        self.job_counters[job_type] = counters
-                    except ValueError:
+                    job_type = _JOBTYPE_BY_VALUE.get(job_type_str)
+                    if job_type:
+                        i = _JOBTYPE_INDEX[job_type]
+                        for key, counts in self._counter_arrays.items():
+                            counts[i] = counters.get(key, 0)
+                    else:
                         logger.warning(f"Unknown job type in saved state: {job_type_str}")
                 
-                logger.info(f"Loaded queue state with {len(self.priority_queue)} jobs")
+                snapshot_seq = state.get("wal_seq", 0)
+            
+            replayed = self._replay_wal(snapshot_seq)
+            for shard in self._shards.values():
+                shard.clear()
+            for prioritized_job in self._job_index.values():
+                self._shards[_JOBTYPE_BY_VALUE[prioritized_job.job_data["job_type"]]].append(prioritized_job)
+            for job_type, shard in self._shards.items():
+                heapq.heapify(shard)
+                self._tombstones[job_type] = 0
+            
+            logger.info(f"Loaded queue state with {len(self._job_index)} jobs ({replayed} logged changes replayed)")
                 
         except Exception as e:
             logger.error(f"Error loading queue state: {e}")
             # Start with empty queue
     
+    def _replay_wal(self, snapshot_seq: int) -> int:
+        """Apply logged mutations newer than the snapshot; returns how many were applied"""
+        self._wal_seq = snapshot_seq
+        if not self.wal_file.exists():
+            return 0
+        
+        applied = 0
+        good_end = 0  # byte offset just past the last complete record
+        with open(self.wal_file, 'r+b') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # A torn final line from a crash mid-append
+                    break
+                try:
+                    record = _loads(line)
+                except ValueError:
+                    break
+                good_end += len(line)
+                
+                seq = record.get("seq", 0)
+                self._wal_seq = max(self._wal_seq, seq)
+                if seq <= snapshot_seq:
+                    continue
+                
+                op = record["op"]
+                if op == "add":
+                    prioritized_job = self._job_from_entry(record["job"])
+                    self._job_index[prioritized_job.job_id] = prioritized_job
+                    self._count(prioritized_job.job_data["job_type"], "total")
+                elif op in ("pop", "cancel"):
+                    prioritized_job = self._job_index.pop(record["job_id"], None)
+                    if op == "cancel" and prioritized_job:
+                        self._count(prioritized_job.job_data["job_type"], "cancelled")
+                elif op == "count":
+                    self._count(record["job_type"], record["key"])
+                applied += 1
+            
+            # Cut off the torn tail, or new records would be appended onto it and
+            # be unreadable on the next replay
+            if f.seek(0, os.SEEK_END) > good_end:
+                logger.warning(f"Truncating torn write-ahead log tail at byte {good_end}")
+                f.truncate(good_end)
+        
+        self._wal_entries = applied
+        return applied
+    
+    def _count(self, job_type_str: str, key: str):
+        """Bump a job counter while replaying the log"""
+        job_type = _JOBTYPE_BY_VALUE.get(job_type_str)
+        counts = self._counter_arrays.get(key)
+        if job_type is None or counts is None:
+            return
+        counts[_JOBTYPE_INDEX[job_type]] += 1
+    
     async def get_queue_statistics(self) -> Dict[str, Any]:
         """Get detailed queue statistics"""
         async with self.stats_lock:
@@ -693,9 +1061,32 @@ class JobQueue:
                         await task
                     except asyncio.CancelledError:
                         pass
-            
-            # Save final state
-            await self.save_queue_state()
-            await self._update_statistics()
+        
+        # Record the results of jobs that just finished or were cancelled
+        if self._completion_task:
+            await self._completions.join()
+            self._completion_task.cancel()
+            try:
+                await self._completion_task
+            except asyncio.CancelledError:
+                pass
+            self._completion_task = None
+        
+        # Save final state (save_queue_state takes queue_lock itself)
+        await self.save_queue_state()
+        await self._update_statistics()
+        
+        # Write out any job rows still waiting for a batch
+        if self._db_flush_task:
+            self._db_flush_task.cancel()
+            try:
+                await self._db_flush_task
+            except asyncio.CancelledError:
+                pass
+            self._db_flush_task = None
+        await self._flush_db_ops()
+        if self._wal_fp is not None:
+            self._wal_fp.close()
+            self._wal_fp = None
         
         logger.info("Job queue shutdown complete")
@@ -10,16 +10,52 @@ Manages the global state of the bot including:
 
 import asyncio
 import json
+import os
 import pickle
+import time
+from array import array
+from collections import Counter, deque
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, is_dataclass
 from enum import Enum
 import logging
 
 logger = logging.getLogger(__name__)
 
+# NumPy is optional; ResourceRing falls back to stdlib arrays without it
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# msgpack is a faster, smaller and load-safe replacement for pickling recovery state
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# orjson encodes dataclasses, enums and datetimes natively in C
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Mutations are appended to bot_state.log; the full snapshot is rewritten (and the
+# log truncated) once this many entries or seconds have accumulated
+STATE_COMPACT_ENTRIES = 500
+STATE_COMPACT_INTERVAL = 60.0  # seconds
+# A due compaction waits this long so a burst of changes settles first
+STATE_FLUSH_DELAY = 0.2  # seconds
+
+# Resource samples kept in memory; older ones drop off the ring
+RESOURCE_HISTORY_SIZE = 1000
+
 class StateType(Enum):
     """Types of state that can be managed"""
     PIPELINE = "pipeline"
@@ -78,6 +114,167 @@ class ResourceUsage:
     active_connections: int = 0
     active_jobs: int = 0
 
+_EPOCH = datetime(1970, 1, 1)
+
+def _dt_to_ns(dt: datetime) -> int:
+    """Naive UTC datetime as epoch nanoseconds"""
+    return (dt - _EPOCH) // timedelta(microseconds=1) * 1000
+
+def _ns_to_dt(ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=ns // 1000)
+
+class ResourceRing:
+    """Fixed-size ring of resource samples, stored as one packed array per field"""
+    
+    # field -> (numpy dtype, array typecode)
+    COLUMNS = {
+        "cpu_percent": ("float32", "f"),
+        "memory_mb": ("float32", "f"),
+        "disk_mb": ("float32", "f"),
+        "active_connections": ("int32", "i"),
+        "active_jobs": ("int32", "i")
+    }
+    
+    def __init__(self, size: int = RESOURCE_HISTORY_SIZE):
+        self.size = size
+        self.head = 0  # next slot to write
+        self.n = 0  # samples currently held
+        self.columns = {name: self._zeros(*types) for name, types in self.COLUMNS.items()}
+        self.ts = self._zeros("int64", "q")  # epoch nanoseconds, naive UTC
+    
+    def _zeros(self, dtype: str, typecode: str):
+        if HAS_NUMPY:
+            return np.zeros(self.size, dtype=dtype)
+        return array(typecode, [0]) * self.size
+    
+    def __len__(self) -> int:
+        return self.n
+    
+    def __iter__(self):
+        """Oldest first, as ResourceUsage objects"""
+        windows = [self._window(column) for column in self.columns.values()]
+        for i, ts in enumerate(self._window(self.ts)):
+            yield ResourceUsage(
+                _ns_to_dt(int(ts)),
+                *(window[i].item() if HAS_NUMPY else window[i] for window in windows)
+            )
+    
+    def record(self, cpu_percent: float, memory_mb: float, disk_mb: float,
+               active_jobs: int, active_connections: int = 0):
+        """Write a sample over the oldest slot"""
+        i = self.head
+        columns = self.columns
+        columns["cpu_percent"][i] = cpu_percent
+        columns["memory_mb"][i] = memory_mb
+        columns["disk_mb"][i] = disk_mb
+        columns["active_connections"][i] = active_connections
+        columns["active_jobs"][i] = active_jobs
+        self.ts[i] = time.time_ns()
+        self.head = (i + 1) % self.size
+        self.n = min(self.n + 1, self.size)
+    
+    def _window(self, column, last: Optional[int] = None):
+        """The last `last` (default: all held) values of column, oldest first"""
+        count = self.n if last is None else min(last, self.n)
+        start = (self.head - count) % self.size
+        if start + count <= self.size:
+            return column[start:start + count]
+        if HAS_NUMPY:
+            return np.concatenate((column[start:], column[:self.head]))
+        return column[start:] + column[:self.head]
+    
+    def mean(self, field_name: str, last: Optional[int] = None) -> float:
+        """Mean of a field over the last `last` samples (default: all held)"""
+        window = self._window(self.columns[field_name], last)
+        if not len(window):
+            return 0.0
+        if HAS_NUMPY:
+            return float(window.mean())
+        return sum(window) / len(window)
+    
+    def drop_older_than(self, cutoff: datetime) -> int:
+        """Forget samples at or before cutoff; returns how many were dropped"""
+        # Samples are recorded in time order, so the expired ones are a prefix
+        window = self._window(self.ts)
+        cutoff_ns = _dt_to_ns(cutoff)
+        if HAS_NUMPY:
+            dropped = int(np.searchsorted(window, cutoff_ns, side='right'))
+        else:
+            dropped = bisect_right(window, cutoff_ns)
+        self.n -= dropped
+        return dropped
+
+# Enum .value is a descriptor lookup and PipelineStage(value) a full Enum call; these are plain dict hits
+_STAGE_BY_VALUE: Dict[str, PipelineStage] = {s.value: s for s in PipelineStage}
+_STAGE_VALUES: Dict[PipelineStage, str] = {s: s.value for s in PipelineStage}
+
+def _json_default(obj):
+    """Encode the types json/orjson can't handle on their own"""
+    if is_dataclass(obj):
+        return vars(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return _STAGE_VALUES.get(obj) or obj.value
+    return str(obj)
+
+def _dumps(obj) -> bytes:
+    """Compact JSON encoding of state dataclasses, via orjson when available"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(obj, separators=(',', ':'), default=_json_default).encode()
+
+def _loads(data):
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+_MSGPACK_DATETIME = 1  # msgpack ext type code for naive datetimes
+
+def _msgpack_default(obj):
+    # msgpack's own timestamp type only takes aware datetimes; keep ours naive on the round trip
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_MSGPACK_DATETIME, obj.isoformat().encode())
+    raise TypeError(f"Cannot serialize {type(obj).__name__} in recovery state")
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    if code == _MSGPACK_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+def _write_durable(path: Path, data: bytes, sync_dir: bool = False):
+    """Replace path with data via fsynced tmp file + rename, so a crash can't leave a torn file"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    
+    if sync_dir:
+        # The rename itself is only durable once the directory entry is flushed
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def _rehydrate_datetimes(data: Dict[str, Any], date_fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Copy of data with the named ISO string fields parsed back into datetimes"""
+    data = dict(data)
+    for date_field in date_fields:
+        if data.get(date_field):
+            data[date_field] = datetime.fromisoformat(data[date_field])
+    return data
+
+def _pipeline_from_dict(data: Dict[str, Any]) -> PipelineState:
+    data = _rehydrate_datetimes(data, ("start_time", "end_time"))
+    stage = data.get("stage", "idle")
+    # Older state files stored str(stage), e.g. "PipelineStage.IDLE"
+    data["stage"] = _STAGE_BY_VALUE.get(stage) or PipelineStage[stage.rpartition('.')[2]]
+    return PipelineState(**data)
+
+def _job_from_dict(data: Dict[str, Any]) -> JobState:
+    return JobState(**_rehydrate_datetimes(data, ("created_at", "started_at", "completed_at")))
+
 class StateManager:
     """Main state management class"""
     
@@ -85,17 +282,38 @@ class StateManager:
         self.config = config
         self.db = db_manager
         self.state_file = config.dirs['state'] / 'bot_state.json'
-        self.recovery_file = config.dirs['state'] / 'recovery_state.pkl'
-        
-        # In-memory state caches
+        self.log_file = config.dirs['state'] / 'bot_state.log'
+        self.rotated_log_file = config.dirs['state'] / 'bot_state.log.1'
+        self.strict_durability = config.pipeline.strict_durability
+        self.max_active_pipelines = config.pipeline.max_active_pipelines
+        self.max_active_jobs = config.pipeline.max_active_jobs
+        self.recovery_file = config.dirs['state'] / ('recovery_state.msgpack' if HAS_MSGPACK else 'recovery_state.pkl')
+        
+        # In-memory state caches, in creation order
         self.active_pipelines: Dict[str, PipelineState] = {}
         self.active_jobs: Dict[str, JobState] = {}
-        self.resource_history: List[ResourceUsage] = []
+        self.resource_history = ResourceRing(RESOURCE_HISTORY_SIZE)
+        
+        # Kept in step with the states above so get_system_status() needn't scan them
+        self._pipeline_stage_counts: Counter = Counter()
+        self._job_status_counts: Counter = Counter()
+        # (end time, id) in the order states finished, so cleanup needn't scan everything
+        self._ended_pipelines: deque = deque()
+        self._ended_jobs: deque = deque()
+        self._resource_samples = 0  # recorded since startup, for the every-10th DB write
         
         # Recovery state
         self.recovery_needed = False
         self.last_save_time = None
         
+        # Change log, compacted into the snapshot by the flusher task
+        self._log_fp = None
+        self._log_entries = 0  # entries logged since the last snapshot
+        self._last_compaction = time.monotonic()
+        self._dirty = asyncio.Event()  # set when a compaction is due
+        self._flush_task: Optional[asyncio.Task] = None
+        self._io_lock = asyncio.Lock()  # one snapshot write at a time
+        
     async def initialize(self):
         """Initialize state manager"""
         logger.info("Initializing state manager...")
@@ -113,14 +331,18 @@ class StateManager:
             logger.warning("Recovery needed from previous shutdown")
             await self.recover_state()
         
+        self._flush_task = asyncio.create_task(self._run_state_flusher())
+        
         logger.info("State manager initialized")
         return self
     
+    # The mutators below never suspend between reading and writing a state, so
+    # concurrent calls can't interleave on the event loop; keep them await-free
     async def create_pipeline_state(self, pipeline_id: str) -> PipelineState:
         """Create a new pipeline state"""
         state = PipelineState(pipeline_id=pipeline_id)
-        self.active_pipelines[pipeline_id] = state
-        await self.save_state()
+        self._put_pipeline(state)
+        self._append_delta("pipeline", pipeline_id, state)
         return state
     
     async def update_pipeline_stage(self, pipeline_id: str, stage: PipelineStage, 
@@ -132,6 +354,33 @@ class StateManager:
         else:
             state = self.active_pipelines[pipeline_id]
         
+        self._apply_stage_update(state, stage, progress, metadata)
+        self._append_delta("pipeline", pipeline_id, state)
+    
+    async def update_pipeline_stages_batch(self, updates: Dict[str, List[Tuple[Any, float, Optional[Dict[str, Any]]]]]):
+        """Apply buffered (stage, progress, metadata) updates, logging one entry per pipeline"""
+        if not updates:
+            return
+        
+        for pipeline_id, stage_updates in updates.items():
+            state = self.active_pipelines.get(pipeline_id)
+            if state is None:
+                state = PipelineState(pipeline_id=pipeline_id)
+                self._put_pipeline(state)
+            
+            for stage, progress, metadata in stage_updates:
+                self._apply_stage_update(state, stage, progress, metadata)
+            self._append_delta("pipeline", pipeline_id, state)
+    
+    def _apply_stage_update(self, state: PipelineState, stage: PipelineStage,
+                            progress: float, metadata: Optional[Dict[str, Any]]):
+        """Apply one stage update to an in-memory pipeline state"""
+        # Callers may pass the stage by value, e.g. "script_generation"
+        if not isinstance(stage, PipelineStage):
+            stage = _STAGE_BY_VALUE.get(stage) or PipelineStage(stage)
+        
+        self._pipeline_stage_counts[state.stage] -= 1
+        self._pipeline_stage_counts[stage] += 1
         state.stage = stage
         state.progress = progress
         
@@ -142,25 +391,28 @@ class StateManager:
             state.start_time = datetime.utcnow()
         elif stage in [PipelineStage.COMPLETED, PipelineStage.FAILED]:
             state.end_time = datetime.utcnow()
+            self._ended_pipelines.append((state.end_time, state.pipeline_id))
         
-        await self.save_state()
-        logger.debug(f"Updated pipeline {pipeline_id} to stage {stage.value} (progress: {progress})")
+        logger.debug(f"Updated pipeline {state.pipeline_id} to stage {_STAGE_VALUES[stage]} (progress: {progress})")
     
     async def set_pipeline_error(self, pipeline_id: str, error_message: str):
         """Set pipeline error state"""
         if pipeline_id in self.active_pipelines:
             state = self.active_pipelines[pipeline_id]
+            self._pipeline_stage_counts[state.stage] -= 1
+            self._pipeline_stage_counts[PipelineStage.FAILED] += 1
             state.stage = PipelineStage.FAILED
             state.error_message = error_message
             state.end_time = datetime.utcnow()
-            await self.save_state()
+            self._ended_pipelines.append((state.end_time, pipeline_id))
+            self._append_delta("pipeline", pipeline_id, state)
             logger.error(f"Pipeline {pipeline_id} failed: {error_message}")
     
     async def create_job_state(self, job_id: str, job_type: str) -> JobState:
         """Create a new job state"""
         state = JobState(job_id=job_id, job_type=job_type)
-        self.active_jobs[job_id] = state
-        await self.save_state()
+        self._put_job(state)
+        self._append_delta("job", job_id, state)
         return state
     
     async def update_job_status(self, job_id: str, status: str, progress: float = 0.0,
@@ -171,41 +423,99 @@ class StateManager:
             return
         
         state = self.active_jobs[job_id]
+        self._job_status_counts[state.status] -= 1
+        self._job_status_counts[status] += 1
         state.status = status
         state.progress = progress
         
         if status == "processing" and not state.started_at:
             state.started_at = datetime.utcnow()
-        elif status in ["completed", "failed"]:
+        elif status in ["completed", "failed", "cancelled"]:
             state.completed_at = datetime.utcnow()
+            self._ended_jobs.append((state.completed_at, job_id))
             state.result = result
             state.error = error
         
-        await self.save_state()
+        self._append_delta("job", job_id, state)
         logger.debug(f"Updated job {job_id} to status {status} (progress: {progress})")
     
+    def _put_pipeline(self, state: PipelineState):
+        """Add or replace a pipeline state, keeping the stage counts in step"""
+        old = self.active_pipelines.get(state.pipeline_id)
+        if old is not None:
+            self._pipeline_stage_counts[old.stage] -= 1
+        self.active_pipelines[state.pipeline_id] = state
+        self._pipeline_stage_counts[state.stage] += 1
+    
+    def _put_job(self, state: JobState):
+        """Add or replace a job state, keeping the status counts in step"""
+        old = self.active_jobs.get(state.job_id)
+        if old is not None:
+            self._job_status_counts[old.status] -= 1
+        self.active_jobs[state.job_id] = state
+        self._job_status_counts[state.status] += 1
+    
+    def _evict_excess(self):
+        """Drop states beyond the configured caps, finished ones (oldest first) before in-flight ones"""
+        evicted = forced = 0
+        
+        # Stale end-time entries (state since removed or re-ended) are skipped, as in cleanup_old_states()
+        ended = self._ended_pipelines
+        while len(self.active_pipelines) > self.max_active_pipelines and ended:
+            end_time, pipeline_id = ended.popleft()
+            state = self.active_pipelines.get(pipeline_id)
+            if state is not None and state.end_time == end_time:
+                self._pipeline_stage_counts[self.active_pipelines.pop(pipeline_id).stage] -= 1
+                evicted += 1
+        while len(self.active_pipelines) > self.max_active_pipelines:
+            pipeline_id = next(iter(self.active_pipelines))
+            self._pipeline_stage_counts[self.active_pipelines.pop(pipeline_id).stage] -= 1
+            forced += 1
+        
+        ended = self._ended_jobs
+        while len(self.active_jobs) > self.max_active_jobs and ended:
+            completed_at, job_id = ended.popleft()
+            state = self.active_jobs.get(job_id)
+            if state is not None and state.completed_at == completed_at:
+                self._job_status_counts[self.active_jobs.pop(job_id).status] -= 1
+                evicted += 1
+        while len(self.active_jobs) > self.max_active_jobs:
+            job_id = next(iter(self.active_jobs))
+            self._job_status_counts[self.active_jobs.pop(job_id).status] -= 1
+            forced += 1
+        
+        if evicted:
+            logger.info(f"Evicted {evicted} finished states over the in-memory limits")
+        if forced:
+            logger.warning(f"Evicted {forced} in-flight states over the in-memory limits; "
+                           f"their later updates will be dropped")
+    
+    def _reindex_states(self):
+        """Rebuild the counts and end-time indexes after the state dicts were replaced"""
+        self._pipeline_stage_counts = Counter(state.stage for state in self.active_pipelines.values())
+        self._job_status_counts = Counter(state.status for state in self.active_jobs.values())
+        self._ended_pipelines = deque(sorted(
+            (state.end_time, pid) for pid, state in self.active_pipelines.items() if state.end_time
+        ))
+        self._ended_jobs = deque(sorted(
+            (state.completed_at, jid) for jid, state in self.active_jobs.items() if state.completed_at
+        ))
+    
     async def record_resource_usage(self, cpu_percent: float, memory_mb: float, 
                                    disk_mb: float, active_jobs: int):
         """Record current resource usage"""
-        usage = ResourceUsage(
-            cpu_percent=cpu_percent,
-            memory_mb=memory_mb,
-            disk_mb=disk_mb,
-            active_jobs=active_jobs
-        )
-        
-        self.resource_history.append(usage)
-        
-        # Keep only last 1000 records
-        if len(self.resource_history) > 1000:
-            self.resource_history = self.resource_history[-1000:]
+        # The ring overwrites the oldest sample once full
+        self.resource_history.record(cpu_percent, memory_mb, disk_mb, active_jobs)
+        self._resource_samples += 1
         
         # Save to database periodically
-        if len(self.resource_history) % 10 == 0:
-            await self.db.record_metric("cpu_usage", cpu_percent)
-            await self.db.record_metric("memory_usage_mb", memory_mb)
-            await self.db.record_metric("disk_usage_mb", disk_mb)
-            await self.db.record_metric("active_jobs", active_jobs)
+        if self._resource_samples % 10 == 0:
+            await self.db.record_metrics_batch([
+                ("cpu_usage", cpu_percent),
+                ("memory_usage_mb", memory_mb),
+                ("disk_usage_mb", disk_mb),
+                ("active_jobs", active_jobs)
+            ])
     
     async def get_active_pipelines(self) -> List[PipelineState]:
         """Get all active pipelines"""
@@ -228,85 +538,174 @@ class StateManager:
         """Clean up old state entries"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours_old)
         
-        # Cleanup pipelines
-        to_remove = []
-        for pipeline_id, state in self.active_pipelines.items():
-            if state.end_time and state.end_time < cutoff_time:
-                to_remove.append(pipeline_id)
+        removed = 0
         
-        for pipeline_id in to_remove:
-            del self.active_pipelines[pipeline_id]
+        # Cleanup pipelines; an entry is stale if the pipeline finished again later or is gone
+        ended = self._ended_pipelines
+        while ended and ended[0][0] < cutoff_time:
+            end_time, pipeline_id = ended.popleft()
+            state = self.active_pipelines.get(pipeline_id)
+            if state is not None and state.end_time == end_time:
+                self._pipeline_stage_counts[self.active_pipelines.pop(pipeline_id).stage] -= 1
+                removed += 1
         
         # Cleanup jobs
-        to_remove = []
-        for job_id, state in self.active_jobs.items():
-            if state.completed_at and state.completed_at < cutoff_time:
-                to_remove.append(job_id)
-        
-        for job_id in to_remove:
-            del self.active_jobs[job_id]
+        ended = self._ended_jobs
+        while ended and ended[0][0] < cutoff_time:
+            completed_at, job_id = ended.popleft()
+            state = self.active_jobs.get(job_id)
+            if state is not None and state.completed_at == completed_at:
+                self._job_status_counts[self.active_jobs.pop(job_id).status] -= 1
+                removed += 1
         
         # Cleanup resource history
-        self.resource_history = [
-            usage for usage in self.resource_history
-            if usage.timestamp > cutoff_time
-        ]
+        self.resource_history.drop_older_than(cutoff_time)
         
+        # Removals aren't logged; rewrite the snapshot without them
+        await self.save_state()
+        logger.info(f"Cleaned up {removed} old state entries")
+    
+    def _append_delta(self, kind: str, key: str, state):
+        """Log the current fields of one pipeline or job, scheduling compaction when due"""
+        if self._log_fp is None:
+            self._log_fp = open(self.log_file, 'ab', buffering=0)
+        record = {"k": kind, "id": key, "f": state}
+        self._log_fp.write(_dumps(record) + b"\n")
+        self._log_entries += 1
+        
+        if (self._log_entries >= STATE_COMPACT_ENTRIES or
+                time.monotonic() - self._last_compaction >= STATE_COMPACT_INTERVAL):
+            self._dirty.set()
+    
+    def _rotate_log(self):
+        """Move the change log aside so changes made during a snapshot write go to a fresh one"""
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+        
+        if self.log_file.exists():
+            if self.rotated_log_file.exists():
+                # A previous snapshot failed; keep its entries ahead of the newer ones
+                with open(self.rotated_log_file, 'ab') as f:
+                    f.write(self.log_file.read_bytes())
+                self.log_file.unlink()
+            else:
+                os.replace(self.log_file, self.rotated_log_file)
+        
+        self._log_entries = 0
+        self._last_compaction = time.monotonic()
+    
+    @staticmethod
+    def _replay_log(path: Path, pipelines: Dict[str, PipelineState], jobs: Dict[str, JobState]) -> int:
+        """Apply logged changes on top of a loaded snapshot; returns how many were applied"""
+        if not path.exists():
+            return 0
+        
+        applied = 0
+        good_end = 0  # byte offset just past the last complete entry
+        with open(path, 'r+b') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final line from a crash mid-append
+                    break
+                try:
+                    record = _loads(line)
+                except ValueError:
+                    break
+                good_end += len(line)
+                
+                if record["k"] == "pipeline":
+                    pipelines[record["id"]] = _pipeline_from_dict(record["f"])
+                elif record["k"] == "job":
+                    jobs[record["id"]] = _job_from_dict(record["f"])
+                applied += 1
+            
+            # Cut off the torn tail, or later appends would join it and be skipped on the next replay
+            if f.seek(0, os.SEEK_END) > good_end:
+                logger.warning(f"Truncating torn state log tail in {path.name} at byte {good_end}")
+                f.truncate(good_end)
+        
+        return applied
+    
+    async def _run_state_flusher(self):
+        """Compact the change log into the snapshot whenever it has grown enough"""
+        while True:
+            await self._dirty.wait()
+            # Let the rest of the burst land in the same write
+            await asyncio.sleep(STATE_FLUSH_DELAY)
+            self._dirty.clear()
+            await self.save_state()
+    
+    async def flush_now(self):
+        """Stop the flusher and compact the state immediately"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        self._dirty.clear()
         await self.save_state()
-        logger.info(f"Cleaned up {len(to_remove)} old state entries")
     
     async def save_state(self):
-        """Save current state to disk"""
-        try:
-            state_data = {
-                "active_pipelines": {
-                    pid: asdict(state) 
-                    for pid, state in self.active_pipelines.items()
-                },
-                "active_jobs": {
-                    jid: asdict(state)
-                    for jid, state in self.active_jobs.items()
-                },
-                "last_save": datetime.utcnow().isoformat()
+        """Save a full snapshot to disk, replacing the change log"""
+        async with self._io_lock:
+            try:
+                # Snapshots run at least every STATE_COMPACT_ENTRIES changes, which bounds the overshoot
+                self._evict_excess()
+                
+                # The dataclasses are encoded directly, without asdict() copies
+                state_data = {
+                    "active_pipelines": self.active_pipelines,
+                    "active_jobs": self.active_jobs,
+                    "last_save": datetime.utcnow().isoformat()
+                }
+                payload = _dumps(state_data)
+                
+                # Everything logged so far is in payload; the rest goes to a new log
+                self._rotate_log()
+                await asyncio.to_thread(self._save_state_sync, payload)
+                
+                self.last_save_time = datetime.utcnow()
+                logger.debug("State saved to disk")
+                
+            except Exception as e:
+                logger.error(f"Failed to save state: {e}")
+    
+    def _save_state_sync(self, payload: bytes):
+        """Write the snapshot, then drop the log it supersedes"""
+        _write_durable(self.state_file, payload, self.strict_durability)
+        self.rotated_log_file.unlink(missing_ok=True)
+    
+    def _load_state_sync(self) -> Tuple[Dict[str, PipelineState], Dict[str, JobState], int]:
+        """Read the snapshot and replay the change logs over it"""
+        pipelines: Dict[str, PipelineState] = {}
+        jobs: Dict[str, JobState] = {}
+        if self.state_file.exists():
+            state_data = _loads(self.state_file.read_bytes())
+            pipelines = {
+                pid: _pipeline_from_dict(data)
+                for pid, data in state_data.get("active_pipelines", {}).items()
             }
-            
-            with open(self.state_file, 'w') as f:
-                json.dump(state_data, f, indent=2, default=str)
-            
-            self.last_save_time = datetime.utcnow()
-            logger.debug("State saved to disk")
-            
-        except Exception as e:
-            logger.error(f"Failed to save state: {e}")
+            jobs = {
+                jid: _job_from_dict(data)
+                for jid, data in state_data.get("active_jobs", {}).items()
+            }
+        
+        # A rotated log is left behind only if the process died before its snapshot landed
+        replayed = self._replay_log(self.rotated_log_file, pipelines, jobs)
+        replayed += self._replay_log(self.log_file, pipelines, jobs)
+        return pipelines, jobs, replayed
     
     async def load_state(self):
         """Load state from disk"""
         try:
-            if self.state_file.exists():
-                with open(self.state_file, 'r') as f:
-                    state_data = json.load(f)
-                
-                # Load pipelines
-                self.active_pipelines = {}
-                for pid, data in state_data.get("active_pipelines", {}).items():
-                    state = PipelineState(**data)
-                    # Convert string dates back to datetime
-                    for date_field in ["start_time", "end_time"]:
-                        if data.get(date_field):
-                            setattr(state, date_field, datetime.fromisoformat(data[date_field]))
-                    self.active_pipelines[pid] = state
-                
-                # Load jobs
-                self.active_jobs = {}
-                for jid, data in state_data.get("active_jobs", {}).items():
-                    state = JobState(**data)
-                    # Convert string dates back to datetime
-                    for date_field in ["created_at", "started_at", "completed_at"]:
-                        if data.get(date_field):
-                            setattr(state, date_field, datetime.fromisoformat(data[date_field]))
-                    self.active_jobs[jid] = state
-                
-                logger.info(f"Loaded state with {len(self.active_pipelines)} pipelines and {len(self.active_jobs)} jobs")
+            self.active_pipelines, self.active_jobs, replayed = await asyncio.to_thread(self._load_state_sync)
+            self._reindex_states()
+            self._log_entries = replayed
+            if self.state_file.exists() or replayed:
+                logger.info(f"Loaded state with {len(self.active_pipelines)} pipelines and {len(self.active_jobs)} jobs ({replayed} logged changes replayed)")
                 
         except Exception as e:
             logger.error(f"Failed to load state: {e}")
@@ -318,8 +717,11 @@ class StateManager:
         """Save recovery state for crash recovery"""
         try:
             recovery_data["saved_at"] = datetime.utcnow()
-            with open(self.recovery_file, 'wb') as f:
-                pickle.dump(recovery_data, f)
+            if HAS_MSGPACK:
+                data = msgpack.packb(recovery_data, use_bin_type=True, default=_msgpack_default)
+            else:
+                data = pickle.dumps(recovery_data)
+            await asyncio.to_thread(_write_durable, self.recovery_file, data, self.strict_durability)
             logger.debug("Recovery state saved")
         except Exception as e:
             logger.error(f"Failed to save recovery state: {e}")
@@ -328,8 +730,13 @@ class StateManager:
         """Load recovery state"""
         try:
             if self.recovery_file.exists():
-                with open(self.recovery_file, 'rb') as f:
-                    recovery_data = pickle.load(f)
+                data = await asyncio.to_thread(self.recovery_file.read_bytes)
+                if HAS_MSGPACK:
+                    recovery_data = msgpack.unpackb(
+                        data, raw=False, strict_map_key=False, ext_hook=_msgpack_ext_hook
+                    )
+                else:
+                    recovery_data = pickle.loads(data)
                 logger.info("Recovery state loaded")
                 return recovery_data
         except Exception as e:
@@ -338,7 +745,7 @@ class StateManager:
     
     async def check_recovery_needed(self) -> bool:
         """Check if recovery is needed from previous shutdown"""
-        if not self.state_file.exists():
+        if not any(path.exists() for path in (self.state_file, self.log_file, self.rotated_log_file)):
             return False
         
         try:
@@ -385,30 +792,24 @@ class StateManager:
     
     async def get_system_status(self) -> Dict[str, Any]:
         """Get overall system status"""
-        active_pipelines = await self.get_active_pipelines()
-        active_jobs = await self.get_active_jobs()
+        stage_counts = self._pipeline_stage_counts
+        status_counts = self._job_status_counts
         
         # Calculate pipeline statistics
         pipeline_stats = {
             "total": len(self.active_pipelines),
-            "active": len(active_pipelines),
-            "completed": len([p for p in self.active_pipelines.values() 
-                            if p.stage == PipelineStage.COMPLETED]),
-            "failed": len([p for p in self.active_pipelines.values() 
-                          if p.stage == PipelineStage.FAILED])
+            "active": len(self.active_pipelines),
+            "completed": stage_counts[PipelineStage.COMPLETED],
+            "failed": stage_counts[PipelineStage.FAILED]
         }
         
         # Calculate job statistics
         job_stats = {
             "total": len(self.active_jobs),
-            "pending": len([j for j in self.active_jobs.values() 
-                          if j.status == "pending"]),
-            "processing": len([j for j in self.active_jobs.values() 
-                             if j.status == "processing"]),
-            "completed": len([j for j in self.active_jobs.values() 
-                            if j.status == "completed"]),
-            "failed": len([j for j in self.active_jobs.values() 
-                          if j.status == "failed"])
+            "pending": status_counts["pending"],
+            "processing": status_counts["processing"],
+            "completed": status_counts["completed"],
+            "failed": status_counts["failed"]
         }
         
         return {
@@ -424,8 +825,11 @@ class StateManager:
         """Clean shutdown of state manager"""
         logger.info("Shutting down state manager...")
         
-        # Save final state
-        await self.save_state()
+        # Save final state, including any write still waiting on the flusher
+        await self.flush_now()
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
         
         # Cleanup recovery file
         if self.recovery_file.exists():
@@ -4,7 +4,7 @@ Database manager for ShortSync Pro
 
 import asyncio
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import aiosqlite
 import json
 from datetime import datetime
@@ -247,62 +247,101 @@ class DatabaseManager:
     async def save_job(self, job_data: dict) -> str:
         """Save job information to database using Job model"""
         try:
-            # Create Job instance
-            job = create_job(**job_data)
-            
-            # Convert to dict for database
-            job_dict = job.to_dict()
-            
-            # Build SQL
-            columns = []
-            placeholders = []
-            values = []
-            
-            for col, val in job_dict.items():
-                columns.append(col)
-                placeholders.append('?')
-                values.append(val)
-            
-            sql = f'''
-                INSERT INTO jobs 
-                ({', '.join(columns)})
-                VALUES ({', '.join(placeholders)})
-            '''
-            
+            job_id, sql, values = self._job_insert(job_data)
             await self.db.execute(sql, values)
             await self.db.commit()
             
-            logger.debug(f"Saved job {job.id} to database")
-            return job.id
+            logger.debug(f"Saved job {job_id} to database")
+            return job_id
             
         except Exception as e:
             logger.error(f"Error saving job: {e}")
             raise
     
+    @staticmethod
+    def _job_insert(job_data: dict):
+        """Build the INSERT for a job; returns (job id, sql, values)"""
+        # Create Job instance
+        job = create_job(**job_data)
+        
+        # Convert to dict for database
+        job_dict = job.to_dict()
+        
+        # Build SQL
+        columns = []
+        placeholders = []
+        values = []
+        
+        for col, val in job_dict.items():
+            columns.append(col)
+            placeholders.append('?')
+            values.append(val)
+        
+        sql = f'''
+            INSERT INTO jobs 
+            ({', '.join(columns)})
+            VALUES ({', '.join(placeholders)})
+        '''
+        return job.id, sql, values
+    
     async def update_job_status(self, job_id: str, status: str, result: dict = None, error: str = None):
         """Update job status"""
+        await self.db.execute(*self._job_status_update(job_id, status, result, error))
+        await self.db.commit()
+        logger.debug(f"Updated job {job_id} status to {status}")
+    
+    @staticmethod
+    def _job_status_update(job_id: str, status: str, result: dict = None, error: str = None):
+        """Build the UPDATE for a job status change; returns (sql, params)"""
         if status == 'completed':
-            await self.db.execute('''
+            return '''
                 UPDATE jobs 
                 SET status = ?, completed_at = CURRENT_TIMESTAMP, 
                     result_json = ?, error_message = ?
                 WHERE id = ?
-            ''', (status, json.dumps(result) if result else None, error, job_id))
+            ''', (status, json.dumps(result) if result else None, error, job_id)
         elif status == 'processing':
-            await self.db.execute('''
+            return '''
                 UPDATE jobs 
                 SET status = ?, started_at = CURRENT_TIMESTAMP
                 WHERE id = ?
-            ''', (status, job_id))
+            ''', (status, job_id)
         else:
-            await self.db.execute('''
+            return '''
                 UPDATE jobs 
                 SET status = ?, error_message = ?
                 WHERE id = ?
-            ''', (status, error, job_id))
+            ''', (status, error, job_id)
+    
+    async def apply_job_ops(self, ops: List[tuple]):
+        """Apply queued job writes in order, in one transaction
+        
+        Each op is ('save', job_data) or ('status', job_id, status, result, error).
+        Consecutive ops with the same statement go through a single executemany.
+        """
+        statements = []
+        for op, *args in ops:
+            if op == 'save':
+                _, sql, values = self._job_insert(*args)
+            else:
+                sql, values = self._job_status_update(*args)
+            statements.append((sql, values))
         
-        await self.db.commit()
-        logger.debug(f"Updated job {job_id} status to {status}")
+        try:
+            i = 0
+            while i < len(statements):
+                sql = statements[i][0]
+                j = i
+                while j < len(statements) and statements[j][0] == sql:
+                    j += 1
+                await self.db.executemany(sql, [values for _, values in statements[i:j]])
+                i = j
+            
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        logger.debug(f"Applied {len(ops)} job writes")
     
     async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job information by ID"""
@@ -330,30 +369,7 @@ class DatabaseManager:
     async def record_metric(self, metric_name: str, metric_value: float, channel: str = None):
         """Record a performance metric using PerformanceMetric model"""
         try:
-            metric = create_performance_metric(
-                metric_name=metric_name,
-                metric_value=metric_value,
-                channel=channel
-            )
-            
-            metric_dict = metric.to_dict()
-            
-            columns = []
-            placeholders = []
-            values = []
-            
-            for col, val in metric_dict.items():
-                columns.append(col)
-                placeholders.append('?')
-                values.append(val)
-            
-            sql = f'''
-                INSERT INTO performance_metrics 
-                ({', '.join(columns)})
-                VALUES ({', '.join(placeholders)})
-            '''
-            
-            await self.db.execute(sql, values)
+            await self.db.execute(*self._metric_insert(metric_name, metric_value, channel))
             await self.db.commit()
             
             logger.debug(f"Recorded metric {metric_name}: {metric_value}")
@@ -361,6 +377,49 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Error recording metric: {e}")
     
+    async def record_metrics_batch(self, rows: List[Tuple[str, float]], channel: str = None):
+        """Record several (metric_name, metric_value) pairs with one executemany and commit"""
+        if not rows:
+            return
+        
+        try:
+            # Every row has the same columns, so they all share one statement
+            inserts = [self._metric_insert(name, value, channel) for name, value in rows]
+            await self.db.executemany(inserts[0][0], [values for _, values in inserts])
+            await self.db.commit()
+            
+            logger.debug(f"Recorded {len(rows)} metrics")
+            
+        except Exception as e:
+            logger.error(f"Error recording metrics: {e}")
+    
+    @staticmethod
+    def _metric_insert(metric_name: str, metric_value: float, channel: Optional[str]):
+        """Build the INSERT for a metric; returns (sql, values)"""
+        metric = create_performance_metric(
+            metric_name=metric_name,
+            metric_value=metric_value,
+            channel=channel
+        )
+        
+        metric_dict = metric.to_dict()
+        
+        columns = []
+        placeholders = []
+        values = []
+        
+        for col, val in metric_dict.items():
+            columns.append(col)
+            placeholders.append('?')
+            values.append(val)
+        
+        sql = f'''
+            INSERT INTO performance_metrics 
+            ({', '.join(columns)})
+            VALUES ({', '.join(placeholders)})
+        '''
+        return sql, values
+    
     async def get_metrics(self, metric_name: str, hours: int = 24, channel: str = None) -> List[Dict[str, Any]]:
         """Get metrics for a specific time period"""
         cursor = await self.db.execute('''
@@ -634,9 +693,11 @@ class DatabaseManager:
     
     async def save_metrics(self, metrics_data: Dict[str, Any]):
         """Save metrics snapshot"""
-        for metric_name, metric_value in metrics_data.items():
-            if metric_name != 'timestamp':
-                await self.record_metric(metric_name, metric_value)
+        await self.record_metrics_batch([
+            (metric_name, metric_value)
+            for metric_name, metric_value in metrics_data.items()
+            if metric_name != 'timestamp'
+        ])
     
     async def get_recent_videos(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get most recent videos"""
@@ -92,6 +92,29 @@ class BaseAssetProvider(ABC):
                           limit: int = 10) -> List[Asset]:
         """Search for image assets"""
         pass
+    
+    async def search_videos_bulk(self, queries: List[str],
+                               duration_range: tuple = (3, 10),
+                               limit: int = 5) -> List[List[Asset]]:
+        """Search videos for several queries; override when the API supports batching
+        
+        A query that fails has its exception in its slot, so it doesn't fail the others.
+        """
+        return list(await asyncio.gather(
+            *(self.search_videos(query, duration_range=duration_range, limit=limit) for query in queries),
+            return_exceptions=True
+        ))
+    
+    async def search_images_bulk(self, queries: List[str],
+                               limit: int = 10) -> List[List[Asset]]:
+        """Search images for several queries; override when the API supports batching
+        
+        A query that fails has its exception in its slot, so it doesn't fail the others.
+        """
+        return list(await asyncio.gather(
+            *(self.search_images(query, limit=limit) for query in queries),
+            return_exceptions=True
+        ))
 
 class BaseVoiceoverProvider(ABC):
     """Abstract base class for voiceover providers"""
@@ -5,6 +5,7 @@ Creates and manages provider instances with fallback logic.
 Supports MCP, simple, and hybrid provider modes.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, Optional, Type
 from enum import Enum
@@ -14,6 +15,13 @@ from bot.providers.base import (
     BaseAssetProvider, BaseVoiceoverProvider, BaseVideoProvider
 )
 
+# aiohttp is only needed for the shared HTTP session
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
 logger = logging.getLogger(__name__)
 
 class ProviderMode(Enum):
@@ -42,6 +50,7 @@ class ProviderFactory:
         self.providers: Dict[str, Any] = {}
         self.provider_configs: Dict[str, ProviderConfig] = {}
         self._initialized = False
+        self._http_session = None  # shared by all simple providers
         
         # Initialize provider configurations
         self._init_provider_configs()
@@ -154,20 +163,43 @@ class ProviderFactory:
             ('video', self.create_video_provider)
         ]
         
-        for provider_name, create_method in provider_types:
-            try:
-                provider = await create_method()
-                if provider:
-                    self.providers[provider_name] = provider
-                    logger.info(f"Initialized {provider_name} provider")
-                else:
-                    logger.warning(f"Could not initialize {provider_name} provider")
-            except Exception as e:
-                logger.error(f"Failed to initialize {provider_name} provider: {e}")
+        # Providers are independent, so create them concurrently
+        results = await asyncio.gather(
+            *(create_method() for _, create_method in provider_types),
+            return_exceptions=True
+        )
+        
+        for (provider_name, _), provider in zip(provider_types, results):
+            if isinstance(provider, Exception):
+                logger.error(f"Failed to initialize {provider_name} provider: {provider}")
+            elif provider:
+                self.providers[provider_name] = provider
+                logger.info(f"Initialized {provider_name} provider")
+            else:
+                logger.warning(f"Could not initialize {provider_name} provider")
         
         self._initialized = True
         logger.info(f"Provider factory initialized with {len(self.providers)} providers")
     
+    @property
+    def http_session(self):
+        """Shared, keep-alive HTTP session for providers (created on first use)"""
+        if not HAS_AIOHTTP:
+            return None
+        
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self._http_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._http_session
+    
     async def create_trend_provider(self) -> Optional[BaseTrendProvider]:
         """Create trend detection provider"""
         config = self.provider_configs.get('trend')
@@ -333,7 +365,8 @@ class ProviderFactory:
                 'youtube_api_key': config.api_keys.get('youtube_api_key'),
                 'newsapi_key': config.api_keys.get('newsapi_key'),
                 'timeout_seconds': config.timeout_seconds,
-                'max_retries': config.max_retries
+                'max_retries': config.max_retries,
+                'http_session': self.http_session
             }
             
             provider = SimpleTrendProvider(provider_config)
@@ -359,7 +392,8 @@ class ProviderFactory:
                 'hf_api_key': config.api_keys.get('hf_api_key'),
                 'openai_api_key': config.api_keys.get('openai_api_key'),
                 'timeout_seconds': config.timeout_seconds,
-                'max_retries': config.max_retries
+                'max_retries': config.max_retries,
+                'http_session': self.http_session
             }
             
             provider = SimpleScriptProvider(provider_config)
@@ -391,7 +425,8 @@ class ProviderFactory:
                 'pexels_api_key': config.api_keys.get('pexels_api_key'),
                 'unsplash_api_key': config.api_keys.get('unsplash_api_key'),
                 'timeout_seconds': config.timeout_seconds,
-                'max_retries': config.max_retries
+                'max_retries': config.max_retries,
+                'http_session': self.http_session
             }
             
             provider = SimpleAssetProvider(provider_config)
@@ -415,7 +450,8 @@ class ProviderFactory:
             provider_config = {
                 'elevenlabs_api_key': config.api_keys.get('elevenlabs_api_key'),
                 'timeout_seconds': config.timeout_seconds,
-                'max_retries': config.max_retries
+                'max_retries': config.max_retries,
+                'http_session': self.http_session
             }
             
             provider = SimpleVoiceoverProvider(provider_config)
@@ -438,7 +474,8 @@ class ProviderFactory:
             
             provider_config = {
                 'timeout_seconds': config.timeout_seconds,
-                'max_retries': config.max_retries
+                'max_retries': config.max_retries,
+                'http_session': self.http_session
             }
             
             provider = SimpleVideoProvider(provider_config)
@@ -506,6 +543,10 @@ class ProviderFactory:
         
         self.providers.clear()
         self._initialized = False
+        
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
         logger.info("All providers closed")
     
     def get_provider_info(self) -> Dict[str, Any]:
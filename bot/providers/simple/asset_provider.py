@@ -21,7 +21,9 @@ class SimpleAssetProvider(BaseAssetProvider):
         self.pexels_api_key = config.get('pexels_api_key')
         self.unsplash_api_key = config.get('unsplash_api_key')
         self.pixabay_api_key = config.get('pixabay_api_key')
-        self.session = None
+        # Shared session from the provider factory, if given; otherwise our own
+        self.session = config.get('http_session')
+        self._owns_session = False
         self.cache = {}
         self.cache_ttl = 1800  # 30 minutes
         
@@ -41,7 +43,9 @@ class SimpleAssetProvider(BaseAssetProvider):
     
     async def initialize(self):
         """Initialize provider"""
-        self.session = aiohttp.ClientSession()
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
     
     async def search_videos(self, query: str, 
                           duration_range: Tuple[int, int] = (3, 10),
@@ -564,5 +568,5 @@ class SimpleAssetProvider(BaseAssetProvider):
     
     async def close(self):
         """Close provider resources"""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
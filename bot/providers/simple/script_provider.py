@@ -18,11 +18,15 @@ class SimpleScriptProvider(BaseScriptProvider):
         self.config = config
         self.cohere_api_key = config.get('cohere_api_key')
         self.hf_api_key = config.get('hf_api_key')
-        self.session = None
+        # Shared session from the provider factory, if given; otherwise our own
+        self.session = config.get('http_session')
+        self._owns_session = False
     
     async def initialize(self):
         """Initialize provider"""
-        self.session = aiohttp.ClientSession()
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
     
     async def generate_script(self, topic: str, 
                             duration_seconds: int = 45) -> Script:
@@ -229,3 +233,8 @@ Script:"""
         script.content = content
         script.metadata['improved'] = True
         return script
+    
+    async def close(self):
+        """Close provider resources"""
+        if self.session and self._owns_session:
+            await self.session.close()
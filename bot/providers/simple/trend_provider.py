@@ -15,13 +15,17 @@ class SimpleTrendProvider(BaseTrendProvider):
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.session = None
+        # Shared session from the provider factory, if given; otherwise our own
+        self.session = config.get('http_session')
+        self._owns_session = False
         self.cache = {}
         self.cache_ttl = 3600  # 1 hour
     
     async def initialize(self):
         """Initialize provider"""
-        self.session = aiohttp.ClientSession()
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
     
     async def get_trends(self, category: Optional[str] = None, 
                         limit: int = 10) -> List[Trend]:
@@ -321,5 +325,5 @@ class SimpleTrendProvider(BaseTrendProvider):
     
     async def close(self):
         """Close provider resources"""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
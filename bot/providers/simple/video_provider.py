@@ -21,6 +21,8 @@ class SimpleVideoProvider(BaseVideoProvider):
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        # Shared session from the provider factory, used for asset downloads
+        self.session = config.get('http_session')
         self.cache_dir = Path(config.get('cache_dir', 'data/video_cache'))
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
@@ -177,9 +179,11 @@ class SimpleVideoProvider(BaseVideoProvider):
                 target_width, target_height = self.video_config['resolution']
                 final_video = resize(final_video, (target_width, target_height))
                 
-                # Write output file
+                # Write output file. Rendering frames is CPU-bound and blocks for the
+                # length of the encode, so run it in a worker thread to keep other jobs moving
                 print(f"Writing video to {output_path}...")
-                final_video.write_videofile(
+                await asyncio.to_thread(
+                    final_video.write_videofile,
                     str(output_path),
                     fps=self.video_config['fps'],
                     codec=self.video_config['codec'],
@@ -556,6 +560,14 @@ class SimpleVideoProvider(BaseVideoProvider):
             print(f"Text video error: {e}")
             return []
     
+    @staticmethod
+    async def _fetch_asset(session, url: str) -> Optional[bytes]:
+        """GET an asset body, or None on a non-200 response"""
+        async with session.get(url, timeout=30) as response:
+            if response.status == 200:
+                return await response.read()
+        return None
+    
     async def _download_asset(self, asset: Asset, temp_path: Path) -> Optional[Path]:
         """Download asset from URL"""
         try:
@@ -569,15 +581,17 @@ class SimpleVideoProvider(BaseVideoProvider):
             if file_path.exists():
                 return file_path
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(asset.url, timeout=30) as response:
-                    if response.status == 200:
-                        content = await response.read()
-                        
-                        with open(file_path, 'wb') as f:
-                            f.write(content)
-                        
-                        return file_path
+            if self.session is not None:
+                content = await self._fetch_asset(self.session, asset.url)
+            else:
+                async with aiohttp.ClientSession() as session:
+                    content = await self._fetch_asset(session, asset.url)
+            
+            if content is not None:
+                with open(file_path, 'wb') as f:
+                    f.write(content)
+                
+                return file_path
             
         except Exception as e:
             print(f"Asset download error: {e}")
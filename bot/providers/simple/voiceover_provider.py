@@ -23,7 +23,9 @@ class SimpleVoiceoverProvider(BaseVoiceoverProvider):
         self.config = config
         self.elevenlabs_api_key = config.get('elevenlabs_api_key')
         self.google_tts_enabled = config.get('google_tts_enabled', True)
-        self.session = None
+        # Shared session from the provider factory, if given; otherwise our own
+        self.session = config.get('http_session')
+        self._owns_session = False
         self.cache_dir = Path(config.get('cache_dir', 'data/voiceover_cache'))
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
@@ -57,7 +59,9 @@ class SimpleVoiceoverProvider(BaseVoiceoverProvider):
     
     async def initialize(self):
         """Initialize provider"""
-        self.session = aiohttp.ClientSession()
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
     
     async def generate_voiceover(self, text: str,
                                voice_id: str = "default",
@@ -146,8 +150,7 @@ class SimpleVoiceoverProvider(BaseVoiceoverProvider):
                     
                     # Write audio data to file
                     audio_data = await response.read()
-                    with open(temp_file, 'wb') as f:
-                        f.write(audio_data)
+                    await asyncio.to_thread(temp_file.write_bytes, audio_data)
                     
                     return temp_file
                 else:
@@ -187,9 +190,9 @@ class SimpleVoiceoverProvider(BaseVoiceoverProvider):
             # Generate speech
             tts = gTTS(text=clean_text, lang=lang_code, slow=False)
             
-            # Save to temp file
+            # Save to temp file; save() fetches the audio synchronously, so keep it off the loop
             temp_file = Path(tempfile.mktemp(suffix='.mp3'))
-            tts.save(str(temp_file))
+            await asyncio.to_thread(tts.save, str(temp_file))
             
             return temp_file
             
@@ -333,8 +336,12 @@ class SimpleVoiceoverProvider(BaseVoiceoverProvider):
             # Try using pydub
             from pydub import AudioSegment
             
-            audio = AudioSegment.from_file(str(input_path))
-            audio.export(str(output_path), format="mp3")
+            # Decoding and encoding are blocking ffmpeg runs; do them in a worker thread
+            def convert():
+                audio = AudioSegment.from_file(str(input_path))
+                audio.export(str(output_path), format="mp3")
+            
+            await asyncio.to_thread(convert)
             return True
             
         except ImportError:
@@ -537,5 +544,5 @@ class SimpleVoiceoverProvider(BaseVoiceoverProvider):
     
     async def close(self):
         """Close provider resources"""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()